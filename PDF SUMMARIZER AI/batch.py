@@ -0,0 +1,159 @@
+# PDF SUMMARIZER AI/batch.py
+"""
+Headless batch runner: summarizes every PDF in a directory or glob without the menu or file dialogs.
+
+    python batch.py papers/ --task research_summary --words 300 --workers 2
+
+Progress is appended to a JSONL manifest. Rerunning the same command skips finished documents
+and resumes unfinished ones at their first incomplete chunk.
+"""
+
+import argparse
+import glob
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import config
+from summarizer.cache import response_cache
+from summarizer.formatter import save_summary, format_json_output
+from summarizer.generator import is_error_response
+from summarizer.pagestore import file_digest
+from summarizer.pipeline import configure_services, create_client, load_prompts, summarize_document, chunk_token_limit, preprocessing_signature
+from summarizer.tracing import tracer
+
+BATCH_TASKS = ("summarize", "research_summary")
+
+class Manifest:
+    """
+    Append-only JSONL log of per-document and per-chunk progress.
+    Each line is one event, so a crash loses at most the event being written.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.documents: dict[str, dict] = {}
+        torn = False
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    torn = not line.endswith("\n")
+                    try:
+                        self._apply(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue  # a torn final line from a crash
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        if torn:
+            self._file.write("\n")  # so the next event starts on its own line instead of extending the torn one
+
+    def _apply(self, event: dict):
+        doc = self.documents.setdefault(event["doc"], {"status": "pending", "chunks": {}})
+        if "chunk" in event:
+            doc["chunks"][int(event["chunk"])] = event["result"]
+        else:
+            doc.update({key: value for key, value in event.items() if key != "doc"})
+
+    def record(self, doc_key: str, **fields):
+        event = {"doc": doc_key, **fields}
+        with self._lock:
+            self._apply(event)
+            self._file.write(json.dumps(event, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def record_chunk(self, doc_key: str, index: int, result: str):
+        self.record(doc_key, chunk=index, result=result)
+
+    def close(self):
+        self._file.close()
+
+def document_key(pdf_path: str, task: str, word_count: int, chunk_limit: int, preprocessing: str, map_model: str) -> str:
+    """Identifies a unit of work by file content, task, anything that changes chunk boundaries and the model the chunks go to."""
+    return f"{file_digest(pdf_path)}:{task}:{word_count}:{chunk_limit}:{map_model}{':' + preprocessing if preprocessing else ''}"
+
+def find_pdfs(target: str) -> list[str]:
+    """Expands a directory (recursively) or a glob pattern into a sorted list of PDF paths."""
+    if os.path.isdir(target):
+        pattern = os.path.join(target, "**", "*.pdf")
+    else:
+        pattern = target
+    return sorted(path for path in glob.glob(pattern, recursive=True) if path.lower().endswith(".pdf"))
+
+def process_document(client, prompts_data: dict, manifest: Manifest, pdf_path: str, task: str, word_count: int) -> str:
+    """Runs one document through the pipeline, resuming from the manifest. Returns its final status."""
+    doc_name = os.path.basename(pdf_path)
+    doc_key = document_key(pdf_path, task, word_count, chunk_token_limit(prompts_data, task), preprocessing_signature(), config.MAP_MODEL_NAME)
+    state = manifest.documents.get(doc_key, {})
+    if state.get("status") == "done":
+        print(f"⏭️  {doc_name}: already done.")
+        return "done"
+
+    completed = dict(state.get("chunks", {}))
+    if completed:
+        print(f"↩️  {doc_name}: resuming with {len(completed)} chunk(s) already processed.")
+    manifest.record(doc_key, status="running", path=pdf_path, task=task, word_count=word_count)
+
+    failed_chunks = []
+    def on_chunk_done(index: int, result: str):
+        if is_error_response(result):
+            failed_chunks.append(index)
+        else:
+            manifest.record_chunk(doc_key, index, result)
+
+    try:
+        # A failed chunk means the document is rerun anyway, so the merge/synthesis calls are skipped.
+        final_output = summarize_document(client, prompts_data, task, pdf_path, word_count, completed=completed, on_chunk_done=on_chunk_done,
+                                          require_all_chunks=True)
+    except Exception as e:
+        manifest.record(doc_key, status="failed", error=str(e))
+        print(f"❌ {doc_name}: {e}")
+        return "failed"
+
+    if failed_chunks or is_error_response(final_output):
+        manifest.record(doc_key, status="incomplete", failed_chunks=sorted(failed_chunks))
+        print(f"⚠️ {doc_name}: {len(failed_chunks)} chunk(s) failed; rerun to resume.")
+        return "incomplete"
+
+    output_basename = f"{os.path.splitext(doc_name)[0]}_{task}"
+    save_summary(format_json_output(final_output, task), output_basename, config.OUTPUT_DIR)
+    manifest.record(doc_key, status="done", output=output_basename)
+    print(f"✅ {doc_name}: saved '{output_basename}'.")
+    return "done"
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a directory or glob of PDFs without the interactive menu.")
+    parser.add_argument("input", help="Directory (searched recursively) or glob pattern, e.g. 'reports/*.pdf'.")
+    parser.add_argument("--task", choices=BATCH_TASKS, default="summarize")
+    parser.add_argument("--words", type=int, default=150, help="Desired word count of each summary.")
+    parser.add_argument("--workers", type=int, default=2, help="Documents processed concurrently.")
+    parser.add_argument("--manifest", default=os.path.join(config.OUTPUT_DIR, "batch_manifest.jsonl"))
+    args = parser.parse_args()
+
+    pdf_paths = find_pdfs(args.input)
+    if not pdf_paths:
+        print(f"❌ No PDF files match '{args.input}'.")
+        return
+
+    client = create_client()
+    configure_services()
+    prompts_data = load_prompts("prompts.json")
+    manifest = Manifest(args.manifest)
+
+    print(f"📚 Processing {len(pdf_paths)} document(s) with task '{args.task}'...")
+    try:
+        with ThreadPoolExecutor(max_workers=max(args.workers, 1)) as executor:
+            statuses = list(executor.map(lambda path: process_document(client, prompts_data, manifest, path, args.task, args.words), pdf_paths))
+    finally:
+        manifest.close()
+
+    counts = {status: statuses.count(status) for status in ("done", "incomplete", "failed")}
+    cache_stats = response_cache.stats()
+    print(f"\n📊 Done: {counts['done']}, incomplete: {counts['incomplete']}, failed: {counts['failed']}. "
+          f"Response cache: {cache_stats['hits']} hit(s), {cache_stats['misses']} miss(es).")
+    if tracer.enabled:
+        print(f"\n{tracer.summary()}")
+        tracer.flush()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+# PDF SUMMARIZER AI/benchmarks/fake_openai_server.py
+"""
+Local stand-in for an OpenAI-compatible chat completions endpoint, for benchmarks and service testing.
+
+    python -m benchmarks.fake_openai_server --port 9000 --latency 0.2 --tokens-per-second 300 --rate-limit-rate 0.05
+
+Point the app at it with GROQ_BASE_URL=http://127.0.0.1:9000/v1 (any GROQ_API_KEY works).
+Supports JSON mode, stream=True (SSE), injected 429s with retry-after, and injected malformed JSON.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = ("the proposed method improves signal quality across all measured conditions while reducing "
+         "computational cost relative to the baseline approach reported in prior work").split()
+
+class FakeSettings:
+    def __init__(self, latency: float = 0.05, tokens_per_second: float = 0, completion_tokens: int = 120,
+                 rate_limit_rate: float = 0.0, malformed_rate: float = 0.0, retry_after: float = 0.5, seed: int = 0):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.rate_limit_rate = rate_limit_rate
+        self.malformed_rate = malformed_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "rate_limited": 0, "malformed": 0, "streamed": 0}
+
+    def roll(self, rate: float) -> bool:
+        with self.lock:
+            return rate > 0 and self.random.random() < rate
+
+    def count(self, key: str):
+        with self.lock:
+            self.stats[key] += 1
+
+def _words(n: int) -> str:
+    return " ".join(WORDS[i % len(WORDS)] for i in range(n))
+
+def fake_content(body: dict, settings: FakeSettings) -> str:
+    """Builds a plausible reply shaped like what the protocol in the system prompt asks for."""
+    system_prompt = body["messages"][0]["content"] if body.get("messages") else ""
+    text = _words(settings.completion_tokens)
+    if (body.get("response_format") or {}).get("type") != "json_object":
+        return text
+    if "key_findings" in system_prompt:
+        payload = {"title": "Synthetic Study", "high_level_analysis": text[:200],
+                   "key_findings": [{"finding": f"Finding {i}: {text[:80]}", "evidence": text[:120],
+                                     "quantitative_support": f"{i * 3.5:.1f} dB", "confidence": "High", "source_page": "1"}
+                                    for i in range(3)],
+                   "strategic_conclusion": text[:100]}
+    elif "common_themes" in system_prompt:
+        payload = {"synthesis_summary": text[:200], "common_themes": [text[:60]], "contrasting_points": [text[:60]],
+                   "unique_insights": [{"document_name": "doc.pdf", "insight": text[:80]}]}
+    else:
+        payload = {"result": text}
+    content = json.dumps(payload)
+    if settings.roll(settings.malformed_rate):
+        settings.count("malformed")
+        content = content[: len(content) * 2 // 3]  # truncated mid-object, like a cut-off generation
+    return content
+
+class FakeHandler(BaseHTTPRequestHandler):
+    settings: FakeSettings = FakeSettings()
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: dict, headers: dict = None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        settings = self.settings
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.rstrip("/").endswith("chat/completions"):
+            self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+            return
+        settings.count("requests")
+
+        if settings.roll(settings.rate_limit_rate):
+            settings.count("rate_limited")
+            self._send_json(429, {"error": {"message": "Rate limit reached (injected).", "type": "rate_limit_error"}},
+                            {"retry-after": str(settings.retry_after), "x-ratelimit-remaining-requests": "0",
+                             "x-ratelimit-reset-requests": f"{settings.retry_after}s"})
+            return
+
+        time.sleep(settings.latency)
+        content = fake_content(body, settings)
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in body.get("messages", []))
+        completion_tokens = len(content.split())
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        headers = {"x-ratelimit-remaining-requests": "1000", "x-ratelimit-remaining-tokens": "1000000"}
+
+        if body.get("stream"):
+            settings.count("streamed")
+            self._stream(completion_id, body.get("model", "fake"), content, usage, headers)
+            return
+
+        if settings.tokens_per_second:
+            time.sleep(completion_tokens / settings.tokens_per_second)
+        self._send_json(200, {
+            "id": completion_id, "object": "chat.completion", "created": int(time.time()), "model": body.get("model", "fake"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage,
+        }, headers)
+
+    def _stream(self, completion_id: str, model: str, content: str, usage: dict, headers: dict):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.close_connection = True
+        delay = 1 / self.settings.tokens_per_second if self.settings.tokens_per_second else 0
+        tokens = content.split(" ")
+        for i, token in enumerate(tokens):
+            piece = token if i == 0 else " " + token
+            chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                     "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            if delay:
+                time.sleep(delay)
+        final = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                 "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "usage": usage}
+        self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+class FakeOpenAIServer:
+    """Runs the fake endpoint on a background thread; use as a context manager in benchmarks."""
+
+    def __init__(self, settings: FakeSettings = None, host: str = "127.0.0.1", port: int = 0):
+        handler = type("BoundFakeHandler", (FakeHandler,), {"settings": settings or FakeSettings()})
+        self.settings = handler.settings
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds before the first byte of each response.")
+    parser.add_argument("--tokens-per-second", type=float, default=0, help="Output throughput; 0 means instant.")
+    parser.add_argument("--completion-tokens", type=int, default=120)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with 429.")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Fraction of JSON-mode replies truncated.")
+    parser.add_argument("--retry-after", type=float, default=0.5)
+    args = parser.parse_args()
+
+    settings = FakeSettings(args.latency, args.tokens_per_second, args.completion_tokens, args.rate_limit_rate, args.malformed_rate, args.retry_after)
+    server = FakeOpenAIServer(settings, args.host, args.port)
+    print(f"Fake OpenAI-compatible server listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+if __name__ == "__main__":
+    main()
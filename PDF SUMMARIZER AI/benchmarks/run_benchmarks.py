@@ -0,0 +1,128 @@
+# PDF SUMMARIZER AI/benchmarks/run_benchmarks.py
+"""
+End-to-end stage benchmarks against a local fake OpenAI-compatible server (no API key or network needed).
+Times each pipeline stage separately on synthetic 10/100/1000-page PDFs and writes the results to JSON.
+
+Run from the project directory:
+    python -m benchmarks.run_benchmarks --pages 10 100 --latency 0.05 --output benchmarks/results/after.json
+    python -m benchmarks.run_benchmarks --baseline benchmarks/results/before.json   # also prints per-stage ratios
+
+MemoryManager add/search is timed only when sentence_transformers is installed.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import time
+from openai import OpenAI
+from benchmarks.fake_openai_server import FakeOpenAIServer, FakeSettings
+from benchmarks.synthetic_pdfs import ensure_pdfs
+from summarizer.extractor import extract_all_data_by_page, intelligent_chunking
+from summarizer.generator import process_chunks, synthesize_chunks, final_synthesis_task, is_error_response, compile_prompts, chunk_token_budget
+
+TASK = "research_summary"
+MODEL_NAME = "llama-3.3-70b-versatile"
+CONTEXT_WINDOW = 8192
+WORD_COUNT = 300
+MAX_RETRIES = 3
+RETRY_DELAY = 1
+
+class StageTimer:
+    """Collects wall-clock seconds per named stage."""
+
+    def __init__(self):
+        self.stages: dict[str, float] = {}
+
+    def time(self, name: str, fn, *args, **kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self.stages[name] = round(time.perf_counter() - start, 4)
+        return result
+
+def bench_document(client, prompts_data: dict, pdf_path: str, args) -> dict:
+    timer = StageTimer()
+    pages = timer.time("extract_all_data_by_page", extract_all_data_by_page, pdf_path, args.extraction_workers)
+    chunks = timer.time("intelligent_chunking", intelligent_chunking, pages, chunk_token_budget(prompts_data, TASK, CONTEXT_WINDOW))
+    summaries = timer.time("process_chunks", process_chunks, client, MODEL_NAME, prompts_data, MAX_RETRIES, RETRY_DELAY,
+                           chunks, TASK, WORD_COUNT, max_workers=args.llm_workers)
+    structured = timer.time("synthesize_chunks", synthesize_chunks, summaries, TASK)
+    timer.time("final_synthesis_task", final_synthesis_task, client, MODEL_NAME, prompts_data, MAX_RETRIES, RETRY_DELAY, structured, WORD_COUNT)
+
+    if importlib.util.find_spec("sentence_transformers"):
+        from summarizer.memory import MemoryManager
+        memory = MemoryManager()
+        texts = [chunk for chunk, _ in chunks]
+        timer.time("memory_add", memory.add_document_chunks, texts, os.path.basename(pdf_path))
+        # Queries the embedding cache has not seen, so the search stage times query encoding and not cache hits.
+        queries = [f"Find earlier work related to: {' '.join(text.split()[:64])}" for text in texts]
+        timer.time("memory_search", memory.search_relevant_contexts, queries)
+    else:
+        timer.stages["memory_add"] = timer.stages["memory_search"] = None
+
+    return {"pages": len(pages), "chunks": len(chunks),
+            "failed_chunks": sum(map(is_error_response, summaries)),
+            "stages": timer.stages, "total": round(sum(v for v in timer.stages.values() if v), 4)}
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def print_comparison(results: dict, baseline_path: str):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {run["pdf_pages"]: run for run in json.load(f)["runs"]}
+    print(f"\nCompared with {baseline_path} (ratio < 1.00 is faster):")
+    for run in results["runs"]:
+        before = baseline.get(run["pdf_pages"])
+        if not before:
+            continue
+        for stage, seconds in run["stages"].items():
+            old = before["stages"].get(stage)
+            if seconds and old:
+                print(f"  {run['pdf_pages']:>5}p  {stage:<26} {old:9.3f}s -> {seconds:9.3f}s  x{seconds / old:5.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--data-dir", default=os.path.join("benchmarks", "data"))
+    parser.add_argument("--output", default=os.path.join("benchmarks", "results", "latest.json"))
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against.")
+    parser.add_argument("--extraction-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--llm-workers", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--tokens-per-second", type=float, default=0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with open("prompts.json", "r", encoding="utf-8") as f:
+        prompts_data = compile_prompts(json.load(f), MODEL_NAME)
+    pdf_paths = ensure_pdfs(args.data_dir, args.pages)
+    settings = FakeSettings(args.latency, args.tokens_per_second, rate_limit_rate=args.rate_limit_rate,
+                            malformed_rate=args.malformed_rate, retry_after=0.1)
+
+    results = {"revision": git_revision(), "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+               "settings": {key: value for key, value in vars(args).items() if key not in ("output", "baseline", "data_dir")}, "runs": []}
+    with FakeOpenAIServer(settings) as server:
+        # As in summarizer.pipeline.create_client(): retries go through the rate limiter, not the SDK.
+        client = OpenAI(api_key="benchmark", base_url=server.base_url, max_retries=0)
+        for pages, pdf_path in pdf_paths.items():
+            run = {"pdf_pages": pages, **bench_document(client, prompts_data, pdf_path, args)}
+            results["runs"].append(run)
+            stages = "  ".join(f"{name}={seconds:.3f}s" for name, seconds in run["stages"].items() if seconds is not None)
+            print(f"📄 {pages:>5} pages, {run['chunks']:>4} chunks: {stages}")
+        results["server"] = dict(server.settings.stats)
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"✅ Results written to {args.output}")
+    if args.baseline:
+        print_comparison(results, args.baseline)
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 # PDF SUMMARIZER AI/config.py
 
+import json
 import os
 from dotenv import load_dotenv
 
@@ -8,6 +9,8 @@ load_dotenv()
 
 # API settings
 MODEL_NAME = os.getenv("MODEL_NAME", "llama-3.3-70b-versatile")
+MAP_MODEL_NAME = os.getenv("MAP_MODEL_NAME", MODEL_NAME)  # per-chunk extraction; a small fast model is usually enough
+REDUCE_MODEL_NAME = os.getenv("REDUCE_MODEL_NAME", MODEL_NAME)  # merges, final synthesis, comparison, and escalated map chunks
 BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1")
 API_KEY = os.getenv("GROQ_API_KEY", "")
 
@@ -19,6 +22,59 @@ if not API_KEY:
 MAX_RETRIES = 3
 RETRY_DELAY = 5  # seconds
 
+# Model context settings
+MODEL_CONTEXT_WINDOW = int(os.getenv("MODEL_CONTEXT_WINDOW", "8192"))  # tokens; chunks fill what the prompt and output reserve leave
+
+# Pre-chunking cleanup (repeated headers/footers and near-duplicate paragraphs)
+CLEAN_PAGES = os.getenv("CLEAN_PAGES", "1") == "1"
+
+# Extractive salience pre-filter before the map stage (off by default)
+SALIENCE_FILTER = os.getenv("SALIENCE_FILTER", "0") == "1"
+SALIENCE_KEEP_RATIO = float(os.getenv("SALIENCE_KEEP_RATIO", "0.5"))  # share of the document's tokens kept
+SALIENCE_TOKEN_BUDGET = int(os.getenv("SALIENCE_TOKEN_BUDGET", "0"))  # hard cap on kept tokens; 0 means ratio only
+
+# Concurrency settings
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "4"))  # in-flight LLM calls per stage
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(os.cpu_count() or 1)))  # processes in the one extraction pool shared by all documents
+
+# Hierarchical reduction settings
+REDUCE_FAN_IN = int(os.getenv("REDUCE_FAN_IN", "4"))  # max summaries merged per call
+REDUCE_TOKEN_BUDGET = int(os.getenv("REDUCE_TOKEN_BUDGET", "3500"))  # max input tokens per merge call
+COMPARE_TOKEN_BUDGET = int(os.getenv("COMPARE_TOKEN_BUDGET", "3500"))  # input tokens shared by all documents in a comparison
+
+# Rate limit settings (per minute and per model, as providers enforce them; 0 disables a budget)
+RATE_LIMIT_RPM = int(os.getenv("RATE_LIMIT_RPM", "30"))
+RATE_LIMIT_TPM = int(os.getenv("RATE_LIMIT_TPM", "12000"))
+
+# Service settings (service.py)
+SERVICE_HOST = os.getenv("SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.getenv("SERVICE_PORT", "8080"))
+SERVICE_QUEUE_SIZE = int(os.getenv("SERVICE_QUEUE_SIZE", "32"))  # queued jobs before submissions are rejected
+SERVICE_WORKERS = int(os.getenv("SERVICE_WORKERS", "4"))  # jobs in progress at once
+SERVICE_EXTRACT_CONCURRENCY = int(os.getenv("SERVICE_EXTRACT_CONCURRENCY", "2"))  # jobs extracting PDFs at once
+SERVICE_LLM_CONCURRENCY = int(os.getenv("SERVICE_LLM_CONCURRENCY", "4"))  # jobs calling the LLM at once
+SERVICE_MAX_UPLOAD_MB = int(os.getenv("SERVICE_MAX_UPLOAD_MB", "100"))
+
 # Output settings
 OUTPUT_DIR = "output"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
\ No newline at end of file
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+# Response cache settings
+CACHE_DIR = os.getenv("CACHE_DIR", "cache")
+CACHE_MAX_MB = int(os.getenv("CACHE_MAX_MB", "256"))
+CACHE_MAX_AGE_DAYS = float(os.getenv("CACHE_MAX_AGE_DAYS", "30"))
+CACHE_BYPASS = os.getenv("LLM_CACHE_BYPASS", "0") == "1"  # skip lookups, still store fresh responses
+
+# Extracted page store settings (page text and paragraph token counts per PDF; an empty directory disables it)
+PAGE_STORE_DIR = os.getenv("PAGE_STORE_DIR", os.path.join(CACHE_DIR, "pages"))
+PAGE_STORE_MAX_MB = int(os.getenv("PAGE_STORE_MAX_MB", "512"))
+
+# Tracing settings (per-stage spans, token usage and cache hits; off by default)
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "0") == "1"
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "")  # '.jsonl' appends span events, '.prom' writes Prometheus text
+# USD per million (input, output) tokens, used for the per-stage cost in the trace summary; MODEL_PRICES (JSON) adds or overrides entries
+MODEL_PRICES = {
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "llama-3.1-8b-instant": (0.05, 0.08),
+    **json.loads(os.getenv("MODEL_PRICES", "{}")),
+}
\ No newline at end of file
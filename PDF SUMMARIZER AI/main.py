@@ -1,18 +1,21 @@
 # PDF SUMMARIZER AI/main.py
 
 import os
-import json
+import time
 import tkinter as tk
 from tkinter import filedialog
 from rich.console import Console
 from rich.panel import Panel
 from rich.status import Status
-from summarizer.extractor import extract_all_data_by_page, intelligent_chunking
-from summarizer.generator import process_chunks, synthesize_chunks, final_synthesis_task
-from summarizer.formatter import save_summary, format_json_output
-from openai import OpenAI
+from rich.text import Text
+from summarizer.formatter import save_summary, format_json_output, SummaryStreamWriter
+from summarizer.cache import response_cache
+from summarizer.pipeline import configure_services, create_client, load_prompts, run_task
+from summarizer.tracing import tracer
 import config
 
+STREAM_PANEL_LINES = 20  # lines of streamed output shown while the final synthesis is written
+
 def select_pdf_files(title: str, multiple: bool = False) -> list[str]:
     """Selects one or more PDF files using a file dialog."""
     root = tk.Tk()
@@ -68,9 +71,9 @@ def main():
     """Main function to run the PDF Summarizer AI application."""
     console = Console()
     try:
-        client = OpenAI(api_key=config.API_KEY, base_url=config.BASE_URL)
-        with open("prompts.json", "r", encoding="utf-8") as f:
-            prompts_data = json.load(f)
+        client = create_client()
+        configure_services()
+        prompts_data = load_prompts("prompts.json")
     except FileNotFoundError:
         console.print("❌ [bold red]Fatal Error:[/bold red] `prompts.json` not found.", style="bold red")
         return
@@ -90,49 +93,37 @@ def main():
             if is_multi_doc: console.print("⚠️ Please select at least two documents for comparison.", style="bold yellow")
             continue
 
+        output_basename = f"{os.path.splitext(os.path.basename(pdf_paths[0]))[0]}_{task}"
         with Status("[bold green]Initiating Cognitive Protocol...[/bold green]", spinner="earth", console=console) as status:
-            final_output = ""
-            if is_multi_doc:
-                 all_docs_content = []
-                 for path in pdf_paths:
-                    doc_name = os.path.basename(path)
-                    status.update(f"Extracting data from [cyan]{doc_name}[/cyan]...")
-                    pages = extract_all_data_by_page(path)
-                    full_text = "\n\n".join(p['text'] for p in pages)
-                    all_docs_content.append(f"--- DOCUMENT: {doc_name} ---\n{full_text}")
-                
-                 status.update("🧠 Synthesizing comparative analysis across documents...")
-                 final_output = process_chunks(client, config.MODEL_NAME, prompts_data, config.MAX_RETRIES, config.RETRY_DELAY, [("\n\n".join(all_docs_content), "Multiple Docs")], task, word_count)[0]
+            # The research summary's final synthesis streams into the status panel and the output file.
+            stream = SummaryStreamWriter(output_basename, config.OUTPUT_DIR, on_update=lambda text: status.update(
+                Panel(Text("\n".join(text.splitlines()[-STREAM_PANEL_LINES:])), title="[bold blue]Writing Final Output...[/bold blue]", expand=False)))
+            tracer.reset()
+            run_started = time.perf_counter()
+            try:
+                final_output = run_task(client, prompts_data, task, pdf_paths, word_count, progress=status.update,
+                                        warn=lambda message: console.print(message, style="bold yellow"), stream=stream)
+            except ValueError as e:
+                console.print(f"❌ {e}", style="bold red")
+                continue
+            finally:
+                stream.close()
+            run_seconds = time.perf_counter() - run_started
 
-            else:
-                pdf_path = pdf_paths[0]
-                doc_name = os.path.basename(pdf_path)
-                status.update(f"📤 [Step 1/2] Extracting data from [cyan]{doc_name}[/cyan]...")
-                pages = extract_all_data_by_page(pdf_path)
-                if not pages:
-                    console.print(f"❌ Could not extract data from '{doc_name}'.", style="bold red")
-                    continue
-                
-                chunks = intelligent_chunking(pages, token_limit=3500)
-                
-                if task == 'research_summary':
-                    status.update(f"🧠 [Step 2/2] Analyzing {len(chunks)} chunk(s) and writing final summary...")
-                    analysis_task = 'research_summary'
-                    processed_chunks = process_chunks(client, config.MODEL_NAME, prompts_data, config.MAX_RETRIES, config.RETRY_DELAY, chunks, analysis_task, word_count)
-                    structured_data_json = synthesize_chunks(processed_chunks, analysis_task)
-                    final_output = final_synthesis_task(client, config.MODEL_NAME, prompts_data, config.MAX_RETRIES, config.RETRY_DELAY, structured_data_json, word_count)
-                
-                else: # Handles the standard "summarize" task
-                    status.update(f"🧠 [Step 2/2] Analyzing {len(chunks)} chunk(s) to extract key findings...")
-                    final_output = process_chunks(client, config.MODEL_NAME, prompts_data, config.MAX_RETRIES, config.RETRY_DELAY, chunks, task, word_count)[0]
-            
             # Formatting and Saving
             if final_output:
                 formatted_content = format_json_output(final_output, task)
-                output_basename = f"{os.path.splitext(os.path.basename(pdf_paths[0]))[0]}_{task}"
                 save_summary(formatted_content, output_basename, config.OUTPUT_DIR)
                 console.print(f"\n✅ [bold green]Success![/bold green] Output saved to the '[cyan]{config.OUTPUT_DIR}[/cyan]' directory.", style="bold green")
                 console.print(Panel(formatted_content, title="[bold blue]Final Output[/bold blue]", expand=False))
+                cache_stats = response_cache.stats()
+                console.print(f"[dim]Response cache: {cache_stats['hits']} hit(s), {cache_stats['misses']} miss(es).[/dim]")
+                if stream.time_to_first_token is not None:
+                    console.print(f"[dim]Final synthesis streamed: first token after {stream.time_to_first_token:.2f}s, complete after {stream.elapsed:.2f}s (run total {run_seconds:.2f}s).[/dim]")
+
+        if tracer.enabled:
+            console.print(Panel(Text(tracer.summary()), title="[bold blue]Run Trace[/bold blue]", expand=False))
+            tracer.flush()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,253 @@
+# PDF SUMMARIZER AI/service.py
+"""
+Long-lived HTTP summarization service.
+
+    python service.py --port 8080 [--base-url http://127.0.0.1:9000/v1]
+
+    POST /jobs?task=summarize&word_count=150   body: a PDF (application/pdf) or multipart files
+    GET  /jobs/{job_id}                        -> status and current stage
+    GET  /jobs/{job_id}/result                 -> formatted and raw output once done
+    GET  /metrics                              -> per-stage span metrics (Prometheus text; needs TRACING_ENABLED=1)
+
+The OpenAI client, prompts and process-wide limiter/cache are set up once at startup.
+Jobs wait in a bounded queue; when it is full, submissions get 503 with Retry-After.
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from aiohttp import web
+import config
+from summarizer.formatter import format_json_output
+from summarizer.pipeline import configure_services, create_client, load_prompts, extract_documents, compare_extracted, summarize_pages
+from summarizer.extractor import extract_all_data_by_page
+from summarizer.tracing import tracer
+
+TASKS = ("summarize", "research_summary", "multi_doc_compare")
+FINISHED_JOBS_KEPT = 1000
+
+class Job:
+    def __init__(self, task: str, word_count: int, pdf_paths: list[str], workdir: str):
+        self.id = uuid.uuid4().hex
+        self.task = task
+        self.word_count = word_count
+        self.pdf_paths = pdf_paths
+        self.workdir = workdir
+        self.status = "queued"
+        self.stage = "queued"
+        self.error = None
+        self.raw_output = None
+        self.formatted_output = None
+        self.created = time.time()
+        self.finished = None
+
+    def to_dict(self) -> dict:
+        return {"job_id": self.id, "task": self.task, "status": self.status, "stage": self.stage,
+                "error": self.error, "created": self.created, "finished": self.finished}
+
+class SummarizationService:
+    """Owns the shared client, the job queue and the worker tasks."""
+
+    def __init__(self, client, prompts_data: dict, queue_size: int, workers: int, extract_concurrency: int, llm_concurrency: int,
+                 max_upload_bytes: int = 0):
+        self.client = client
+        self.prompts_data = prompts_data
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.jobs: dict[str, Job] = {}
+        self.worker_count = workers
+        self.extract_slots = asyncio.Semaphore(extract_concurrency)
+        self.llm_slots = asyncio.Semaphore(llm_concurrency)
+        self.max_upload_bytes = max_upload_bytes
+        self._workers: list[asyncio.Task] = []
+
+    async def start(self, app=None):
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+
+    async def stop(self, app=None):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        tracer.flush()
+
+    def submit(self, job: Job):
+        """Queues a job. Raises asyncio.QueueFull when the service is saturated."""
+        self.queue.put_nowait(job)
+        self.jobs[job.id] = job
+        self._prune()
+
+    def _prune(self):
+        finished = [job for job in self.jobs.values() if job.finished]
+        for job in sorted(finished, key=lambda job: job.finished)[:max(len(finished) - FINISHED_JOBS_KEPT, 0)]:
+            del self.jobs[job.id]
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, job: Job):
+        job.status = "running"
+        try:
+            job.stage = "extracting"
+            async with self.extract_slots:
+                if job.task == "multi_doc_compare":
+                    documents = await asyncio.to_thread(extract_documents, job.pdf_paths)
+                else:
+                    pages = await asyncio.to_thread(extract_all_data_by_page, job.pdf_paths[0], config.EXTRACTION_WORKERS)
+                    if not pages:
+                        raise ValueError(f"Could not extract data from '{os.path.basename(job.pdf_paths[0])}'.")
+
+            job.stage = "analyzing"
+            async with self.llm_slots:
+                if job.task == "multi_doc_compare":
+                    job.raw_output = await asyncio.to_thread(compare_extracted, self.client, self.prompts_data, documents, job.word_count)
+                else:
+                    job.raw_output = await asyncio.to_thread(summarize_pages, self.client, self.prompts_data, job.task, pages, job.word_count)
+            job.formatted_output = format_json_output(job.raw_output, job.task)
+            job.status = "done"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.stage = job.status
+            job.finished = time.time()
+            shutil.rmtree(job.workdir, ignore_errors=True)
+
+    # --- HTTP handlers -----------------------------------------------------
+
+    async def handle_submit(self, request: web.Request) -> web.Response:
+        task = request.query.get("task", "summarize")
+        if task not in TASKS:
+            return web.json_response({"error": f"Unknown task '{task}'. Choose one of {list(TASKS)}."}, status=400)
+        try:
+            word_count = int(request.query.get("word_count", "150"))
+        except ValueError:
+            return web.json_response({"error": "word_count must be an integer."}, status=400)
+        if word_count < 1:
+            return web.json_response({"error": "word_count must be at least 1."}, status=400)
+        if self.queue.full():
+            return web.json_response({"error": "Job queue is full; retry later."}, status=503, headers={"Retry-After": "5"})
+
+        workdir = tempfile.mkdtemp(prefix="summarizer-job-")
+        try:
+            pdf_paths = await self._save_uploads(request, workdir)
+        except ValueError as e:
+            shutil.rmtree(workdir, ignore_errors=True)
+            return web.json_response({"error": str(e)}, status=400)
+        except web.HTTPRequestEntityTooLarge:
+            shutil.rmtree(workdir, ignore_errors=True)
+            raise
+        if task == "multi_doc_compare" and len(pdf_paths) < 2:
+            shutil.rmtree(workdir, ignore_errors=True)
+            return web.json_response({"error": "multi_doc_compare needs at least two PDFs."}, status=400)
+
+        job = Job(task, word_count, pdf_paths if task == "multi_doc_compare" else pdf_paths[:1], workdir)
+        try:
+            self.submit(job)
+        except asyncio.QueueFull:
+            shutil.rmtree(workdir, ignore_errors=True)
+            return web.json_response({"error": "Job queue is full; retry later."}, status=503, headers={"Retry-After": "5"})
+        return web.json_response(job.to_dict(), status=202, headers={"Location": f"/jobs/{job.id}"})
+
+    async def _save_uploads(self, request: web.Request, workdir: str) -> list[str]:
+        """
+        Writes the uploaded PDF(s) into `workdir` and returns their paths.
+        Streamed bodies bypass aiohttp's client_max_size, so the upload limit is enforced here while writing.
+        """
+        pdf_paths = []
+        received = 0
+
+        def write(f, chunk: bytes):
+            nonlocal received
+            received += len(chunk)
+            if self.max_upload_bytes and received > self.max_upload_bytes:
+                raise web.HTTPRequestEntityTooLarge(self.max_upload_bytes, received, content_type="application/json",
+                                                    text=f'{{"error": "Upload exceeds {self.max_upload_bytes} bytes."}}')
+            f.write(chunk)
+
+        if request.content_type.startswith("multipart/"):
+            reader = await request.multipart()
+            async for part in reader:
+                if not part.filename:
+                    continue
+                path = os.path.join(workdir, f"{len(pdf_paths):03d}_{os.path.basename(part.filename)}")
+                with open(path, "wb") as f:
+                    while chunk := await part.read_chunk():
+                        write(f, chunk)
+                pdf_paths.append(path)
+        else:
+            name = os.path.basename(request.query.get("filename", "document.pdf"))
+            path = os.path.join(workdir, name)
+            with open(path, "wb") as f:
+                async for chunk in request.content.iter_chunked(1 << 16):
+                    write(f, chunk)
+            if os.path.getsize(path):
+                pdf_paths.append(path)
+        if not pdf_paths:
+            raise ValueError("No PDF was uploaded.")
+        return pdf_paths
+
+    def _get_job(self, request: web.Request) -> Job:
+        job = self.jobs.get(request.match_info["job_id"])
+        if not job:
+            raise web.HTTPNotFound(text='{"error": "Unknown job."}', content_type="application/json")
+        return job
+
+    async def handle_status(self, request: web.Request) -> web.Response:
+        return web.json_response(self._get_job(request).to_dict())
+
+    async def handle_result(self, request: web.Request) -> web.Response:
+        job = self._get_job(request)
+        if job.status == "failed":
+            return web.json_response(job.to_dict(), status=500)
+        if job.status != "done":
+            return web.json_response(job.to_dict(), status=409)
+        return web.json_response({**job.to_dict(), "result": job.formatted_output, "raw": job.raw_output})
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok", "queued": self.queue.qsize(), "jobs": len(self.jobs)})
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=tracer.prometheus_text(), content_type="text/plain")
+
+def create_app(client=None, prompts_data: dict = None) -> web.Application:
+    """Builds the aiohttp application; `client` and `prompts_data` default to the configured ones."""
+    configure_services()
+    service = SummarizationService(
+        client or create_client(),
+        prompts_data or load_prompts("prompts.json"),
+        queue_size=config.SERVICE_QUEUE_SIZE,
+        workers=config.SERVICE_WORKERS,
+        extract_concurrency=config.SERVICE_EXTRACT_CONCURRENCY,
+        llm_concurrency=config.SERVICE_LLM_CONCURRENCY,
+        max_upload_bytes=config.SERVICE_MAX_UPLOAD_MB * 1024 * 1024,
+    )
+    app = web.Application(client_max_size=config.SERVICE_MAX_UPLOAD_MB * 1024 * 1024)
+    app["service"] = service
+    app.on_startup.append(service.start)
+    app.on_cleanup.append(service.stop)
+    app.router.add_post("/jobs", service.handle_submit)
+    app.router.add_get("/jobs/{job_id}", service.handle_status)
+    app.router.add_get("/jobs/{job_id}/result", service.handle_result)
+    app.router.add_get("/health", service.handle_health)
+    app.router.add_get("/metrics", service.handle_metrics)
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the PDF summarization HTTP service.")
+    parser.add_argument("--host", default=config.SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=config.SERVICE_PORT)
+    parser.add_argument("--base-url", default=config.BASE_URL, help="OpenAI-compatible endpoint, e.g. a local stub server.")
+    args = parser.parse_args()
+    client = create_client(args.base_url)
+    web.run_app(create_app(client), host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# PDF SUMMARIZER AI/summarizer/cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+def make_cache_key(model_name: str, messages: list, temperature: float, response_format: dict) -> str:
+    """Hashes everything that determines an LLM response into a stable cache key."""
+    payload = json.dumps([model_name, messages, temperature, response_format], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """
+    Persistent, content-addressed SQLite cache for LLM responses.
+    Entries are evicted by age and, least recently used first, by total size.
+    """
+
+    EVICT_EVERY = 50  # writes between eviction passes
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.path = None
+        self.max_bytes = 0
+        self.max_age = 0.0
+        self.bypass = False
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+
+    def configure(self, path: str, max_bytes: int = 256 * 1024 * 1024, max_age_days: float = 30, bypass: bool = False):
+        """Opens (or creates) the cache database. With `bypass`, lookups are skipped but fresh responses are still stored."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+            self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+            self._conn.commit()
+            self.path = path
+            self.max_bytes = max_bytes
+            self.max_age = max_age_days * 86400
+            self.bypass = bypass
+            self._evict()
+
+    @property
+    def enabled(self) -> bool:
+        return self._conn is not None
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached response for `key`, or None on a miss."""
+        if not self._conn or self.bypass:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and (not self.max_age or now - row[1] <= self.max_age):
+                self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+                self.hits += 1
+                return row[0]
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: str):
+        """Stores a response under `key`."""
+        if not self._conn:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value.encode("utf-8")), now, now),
+            )
+            self._conn.commit()
+            self._writes += 1
+            if self._writes % self.EVICT_EVERY == 0:
+                self._evict()
+
+    def _evict(self):
+        """Drops expired entries, then the least recently used ones until under `max_bytes`. Caller holds the lock."""
+        if self.max_age:
+            self._conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.max_age,))
+        if self.max_bytes:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                excess = total - self.max_bytes
+                doomed, freed = [], 0
+                for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed"):
+                    doomed.append((key,))
+                    freed += size
+                    if freed >= excess:
+                        break
+                self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self._conn.commit()
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters for this process."""
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+# Shared by every LLM call in the process; disabled until main.py configures it.
+response_cache = ResponseCache()
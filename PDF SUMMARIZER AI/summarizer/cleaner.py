@@ -0,0 +1,154 @@
+# PDF SUMMARIZER AI/summarizer/cleaner.py
+
+import itertools
+import re
+import zlib
+import numpy as np
+from typing import Iterable, Iterator
+from summarizer.extractor import with_text
+from summarizer.parser import count_tokens_many
+
+_DIGITS = re.compile(r"\d+")
+_SPACES = re.compile(r"\s+")
+_WORDS = re.compile(r"\w+")
+_PARAGRAPH_BREAK = re.compile(r"(\n\s*\n)")
+
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+
+def _line_key(line: str) -> str:
+    """Normalizes a line so running headers match across pages ('Page 3 of 10' ~ 'Page 4 of 10')."""
+    return _SPACES.sub(" ", _DIGITS.sub("#", line.strip().lower()))
+
+class PageCleaner:
+    """
+    Removes boilerplate from a stream of extracted pages before chunking:
+    - header/footer lines that repeat at the top or bottom of many pages (journal banners, running titles, page numbers),
+      learned from the first `warmup_pages` pages;
+    - paragraphs that nearly duplicate an earlier one, found with MinHash signatures and LSH banding.
+    Page numbers are kept, so source_page citations still point at the original pages.
+    """
+
+    def __init__(self, warmup_pages: int = 12, edge_lines: int = 3, min_repeat_ratio: float = 0.4, min_pages: int = 3,
+                 shingle_words: int = 3, num_perm: int = 64, bands: int = 16, duplicate_threshold: float = 0.7, min_paragraph_words: int = 12,
+                 model_name: str = "llama-3.3-70b-versatile"):
+        self.warmup_pages = warmup_pages
+        self.edge_lines = edge_lines
+        self.min_repeat_ratio = min_repeat_ratio
+        self.min_pages = min_pages
+        self.shingle_words = shingle_words
+        self.bands = bands
+        self.duplicate_threshold = duplicate_threshold
+        self.min_paragraph_words = min_paragraph_words
+        self.model_name = model_name
+        rng = np.random.default_rng(0)
+        self._perm_a = rng.integers(1, int(_MERSENNE_PRIME), size=(num_perm, 1), dtype=np.uint64)
+        self._perm_b = rng.integers(0, int(_MERSENNE_PRIME), size=(num_perm, 1), dtype=np.uint64)
+        self._boilerplate: set[tuple[str, int, str]] = set()
+        self._signatures: list[np.ndarray] = []
+        self._numbers: list[list[str]] = []
+        self._buckets: dict[tuple[int, bytes], list[int]] = {}
+        self.lines_removed = 0
+        self.paragraphs_removed = 0
+        self.tokens_saved = 0
+
+    def _edges(self, lines: list[str]) -> list[tuple[tuple[str, int], list[int]]]:
+        """The indexes of the first and last `edge_lines` non-empty lines of a page, outermost first, per edge."""
+        content = [i for i, line in enumerate(lines) if line.strip()]
+        top = content[:self.edge_lines]
+        bottom = [i for i in reversed(content[-self.edge_lines:]) if i not in top]
+        return [("top", top), ("bottom", bottom)]
+
+    def _learn(self, pages: list[dict]):
+        """Marks edge lines seen at the same position on at least `min_repeat_ratio` of the warm-up pages as boilerplate."""
+        if len(pages) < self.min_pages:
+            return
+        counts: dict[tuple[str, int, str], int] = {}
+        for page in pages:
+            lines = page["text"].split("\n")
+            for edge, indexes in self._edges(lines):
+                for rank, i in enumerate(indexes):
+                    key = (edge, rank, _line_key(lines[i]))
+                    counts[key] = counts.get(key, 0) + 1
+        needed = max(2, self.min_repeat_ratio * len(pages))
+        self._boilerplate = {key for key, count in counts.items() if count >= needed}
+
+    def _strip_edges(self, text: str, removed: list[str]) -> str:
+        """Drops boilerplate lines working inwards from each edge, stopping at the first line of real content."""
+        if not self._boilerplate:
+            return text
+        lines = text.split("\n")
+        drop = set()
+        for edge, indexes in self._edges(lines):
+            for rank, i in enumerate(indexes):
+                if (edge, rank, _line_key(lines[i])) not in self._boilerplate:
+                    break
+                drop.add(i)
+        if not drop or all(i in drop for i, line in enumerate(lines) if line.strip()):
+            return text  # never blank a page: a "header" covering all of it is more likely templated content
+        removed.extend(lines[i] for i in sorted(drop))
+        self.lines_removed += len(drop)
+        return "\n".join(line for i, line in enumerate(lines) if i not in drop)
+
+    def _signature(self, words: list[str]) -> np.ndarray:
+        k = min(self.shingle_words, len(words))
+        shingles = np.fromiter((zlib.crc32(" ".join(words[i:i + k]).encode("utf-8")) for i in range(len(words) - k + 1)), dtype=np.uint64)
+        return ((self._perm_a * shingles + self._perm_b) % _MERSENNE_PRIME).min(axis=1)
+
+    def _is_near_duplicate(self, paragraph: str) -> bool:
+        """Checks a paragraph against every earlier one via LSH buckets, remembering it if it is new."""
+        words = _WORDS.findall(paragraph.lower())
+        if len(words) < self.min_paragraph_words:
+            return False
+        signature = self._signature(words)
+        numbers = _DIGITS.findall(paragraph)  # must match exactly: rows that differ only in results are kept
+        band_keys = [(band, rows.tobytes()) for band, rows in enumerate(np.array_split(signature, self.bands))]
+        candidates = {index for key in band_keys for index in self._buckets.get(key, ())}
+        for index in candidates:
+            if self._numbers[index] == numbers and np.mean(self._signatures[index] == signature) >= self.duplicate_threshold:
+                return True
+        index = len(self._signatures)
+        self._signatures.append(signature)
+        self._numbers.append(numbers)
+        for key in band_keys:
+            self._buckets.setdefault(key, []).append(index)
+        return False
+
+    def _drop_duplicates(self, text: str, removed: list[str]) -> str:
+        parts = _PARAGRAPH_BREAK.split(text)  # paragraphs at even indexes, their separators at odd ones
+        kept = []
+        for i in range(0, len(parts), 2):
+            if parts[i].strip() and self._is_near_duplicate(parts[i]):
+                removed.append(parts[i])
+                self.paragraphs_removed += 1
+                continue
+            kept.append(parts[i])
+            if i + 1 < len(parts):
+                kept.append(parts[i + 1])
+        return "".join(kept)
+
+    def _clean_page(self, page: dict) -> dict:
+        removed = []
+        text = self._drop_duplicates(self._strip_edges(page["text"], removed), removed)
+        if removed:
+            self.tokens_saved += sum(count_tokens_many(removed, self.model_name))
+        return with_text(page, text)
+
+    def clean(self, pages: Iterable[dict]) -> Iterator[dict]:
+        """
+        Yields cleaned pages in order. Only the warm-up pages are buffered; pages left empty are dropped.
+        """
+        pages = iter(pages)
+        warmup = []
+        for page in pages:
+            warmup.append(page)
+            if len(warmup) >= self.warmup_pages:
+                break
+        self._learn(warmup)
+        for page in itertools.chain(warmup, pages):
+            cleaned = self._clean_page(page)
+            if cleaned["text"].strip():
+                yield cleaned
+
+    def report(self) -> str:
+        return (f"🧹 Removed {self.lines_removed} repeated header/footer line(s) and {self.paragraphs_removed} duplicate paragraph(s), "
+                f"saving ~{self.tokens_saved:,} tokens.")
@@ -0,0 +1,108 @@
+# PDF SUMMARIZER AI/summarizer/embeddings.py
+
+import hashlib
+import json
+import os
+import threading
+import numpy as np
+from typing import List, Optional
+
+class EmbeddingCache:
+    """
+    Fixed-capacity, text-hash-keyed cache of embedding vectors with LRU eviction.
+    With a `directory`, vectors, keys and access clocks live in float32/uint8/int64 memmaps,
+    so entries persist across runs without rewriting the whole cache.
+    """
+
+    KEY_BYTES = 16
+
+    def __init__(self, model_name: str, directory: Optional[str] = None, capacity: int = 100_000):
+        self.model_name = model_name
+        self.directory = directory
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._slots = {}  # key bytes -> slot
+        self._clock = 0
+        self.vectors = None
+        self.hits = 0
+        self.misses = 0
+        if directory and os.path.exists(self._path("meta.json")):
+            with open(self._path("meta.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            self.capacity = meta["capacity"]
+            self._open(meta["dimension"])
+
+    def _path(self, suffix: str) -> str:
+        safe_name = self.model_name.replace("/", "_")
+        return os.path.join(self.directory, f"{safe_name}.{suffix}")
+
+    def _open(self, dimension: int):
+        """Allocates (or maps existing) storage once the embedding dimension is known."""
+        if not self.directory:
+            self.vectors = np.zeros((self.capacity, dimension), dtype=np.float32)
+            self.keys = np.zeros((self.capacity, self.KEY_BYTES), dtype=np.uint8)
+            self.access = np.zeros(self.capacity, dtype=np.int64)
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        exists = os.path.exists(self._path("meta.json"))
+        mode = "r+" if exists else "w+"
+        self.vectors = np.memmap(self._path("vectors.f32"), dtype=np.float32, mode=mode, shape=(self.capacity, dimension))
+        self.keys = np.memmap(self._path("keys.u8"), dtype=np.uint8, mode=mode, shape=(self.capacity, self.KEY_BYTES))
+        self.access = np.memmap(self._path("access.i64"), dtype=np.int64, mode=mode, shape=(self.capacity,))
+        if exists:
+            for slot in np.flatnonzero(self.access):
+                self._slots[self.keys[slot].tobytes()] = int(slot)
+            self._clock = int(self.access.max(initial=0))
+        else:
+            with open(self._path("meta.json"), "w", encoding="utf-8") as f:
+                json.dump({"dimension": dimension, "capacity": self.capacity}, f)
+
+    def _key(self, text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=self.KEY_BYTES, person=b"emb-cache").digest()
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Returns a cached vector (copy) for each text, or None where it is not cached."""
+        results = []
+        with self._lock:
+            for text in texts:
+                slot = self._slots.get(self._key(text)) if self.vectors is not None else None
+                if slot is None:
+                    self.misses += 1
+                    results.append(None)
+                    continue
+                self.hits += 1
+                self._clock += 1
+                self.access[slot] = self._clock
+                results.append(np.array(self.vectors[slot]))
+        return results
+
+    def put_many(self, texts: List[str], vectors: np.ndarray):
+        """Stores vectors for texts, evicting the least recently used entries when full."""
+        with self._lock:
+            if self.vectors is None:
+                self._open(vectors.shape[1])
+            new = [(self._key(text), vector) for text, vector in zip(texts, vectors)]
+            new = list({key: vector for key, vector in new if key not in self._slots}.items())[:self.capacity]
+            if not new:
+                return
+            free = np.flatnonzero(self.access == 0)[:len(new)]
+            if len(free) < len(new):
+                needed = len(new) - len(free)
+                victims = np.argpartition(np.where(self.access == 0, np.iinfo(np.int64).max, self.access), needed - 1)[:needed]
+                for slot in victims:
+                    self._slots.pop(self.keys[slot].tobytes(), None)
+                free = np.concatenate([free, victims])
+            for slot, (key, vector) in zip(free.tolist(), new):
+                self._clock += 1
+                self.vectors[slot] = vector
+                self.keys[slot] = np.frombuffer(key, dtype=np.uint8)
+                self.access[slot] = self._clock
+                self._slots[key] = slot
+
+    def flush(self):
+        """Writes memmapped changes to disk."""
+        with self._lock:
+            if isinstance(self.vectors, np.memmap):
+                self.vectors.flush()
+                self.keys.flush()
+                self.access.flush()
@@ -1,57 +1,308 @@
 # PDF SUMMARIZER AI/summarizer/extractor.py
 
 import fitz # PyMuPDF
+import multiprocessing
 import re
-from summarizer.parser import count_tokens
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterable, Iterator, Optional
+from summarizer.pagestore import page_store
+from summarizer.parser import count_tokens_many, split_by_tokens
+from summarizer.tracing import tracer
 
-def extract_all_data_by_page(pdf_path: str) -> list[dict]:
-    """Extracts text from each page of a PDF."""
+# Below this many pages a process pool costs more to start than it saves.
+PARALLEL_MIN_PAGES = 64
+# Tokens added by the blank line that joins two paragraphs in a chunk.
+PARAGRAPH_SEPARATOR_TOKENS = 1
+# Bump when page text extraction, paragraph splitting or token counting changes, so stored pages are re-extracted.
+EXTRACTOR_VERSION = 1
+
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+def split_paragraphs(text: str) -> list[str]:
+    """Splits page text into paragraphs (or keeps it whole if it has no blank lines), as the chunker sees them."""
+    return _PARAGRAPH_BREAK.split(text)
+
+def with_text(page: dict, text: str) -> dict:
+    """A copy of `page` with new text; stored paragraph token counts are dropped unless the text is unchanged."""
+    if text == page["text"]:
+        return dict(page)
+    return {**{key: value for key, value in page.items() if key != "paragraph_tokens"}, "text": text}
+
+def _extract_page_range(pdf_path: str, start: int, stop: int) -> list[dict]:
+    """Extracts pages [start, stop) (0-based). Runs in a worker process with its own document handle."""
     page_data = []
-    try:
+    with fitz.open(pdf_path) as doc:
+        for page_index in range(start, stop):
+            page_text = doc[page_index].get_text("text")
+            if page_text.strip():
+                page_data.append({"page": page_index + 1, "text": page_text})
+    return page_data
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _process_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    The process pool shared by every extraction in this process, created on first use with `workers` processes.
+    Workers are spawned rather than forked: extraction is called from batch and service threads, and forking while
+    other threads hold locks (sqlite, the tokenizer, stdout) can deadlock the child.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def _discard_pool(executor: ProcessPoolExecutor):
+    """Drops a pool whose worker died, so the next extraction starts a fresh one instead of failing forever."""
+    global _pool
+    with _pool_lock:
+        if _pool is executor:
+            _pool = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+def _page_ranges(page_count: int, workers: int) -> list[tuple[int, int]]:
+    """Splits a document into ~4 ranges per worker so uneven pages still balance across the pool."""
+    step = max(8, -(-page_count // (workers * 4)))
+    return [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+
+def _page_count(pdf_path: str) -> int:
+    with fitz.open(pdf_path) as doc:
+        return doc.page_count
+
+def _extract_pages(pdf_path: str, workers: int) -> Iterator[dict]:
+    page_count = _page_count(pdf_path) if workers > 1 else 0
+    if page_count < PARALLEL_MIN_PAGES:
         with fitz.open(pdf_path) as doc:
             for page_num, page in enumerate(doc, start=1):
                 page_text = page.get_text("text")
                 if page_text.strip():
-                    page_data.append({"page": page_num, "text": page_text})
+                    yield {"page": page_num, "text": page_text}
+        return
+
+    executor = _process_pool(workers)
+    pending = deque()
+    try:
+        for start, stop in _page_ranges(page_count, workers):
+            pending.append(executor.submit(_extract_page_range, pdf_path, start, stop))
+            # Keep a bounded window of ranges in flight so memory does not grow with the document.
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    except BrokenProcessPool:
+        _discard_pool(executor)
+        raise
+    finally:
+        for future in pending:
+            future.cancel()
+
+def _add_paragraph_tokens(page: dict) -> dict:
+    page["paragraph_tokens"] = count_tokens_many(split_paragraphs(page["text"]))
+    return page
+
+class _StoreWriter:
+    """
+    Writes a document's extracted pages to the page store. The store is only a cache: if creating, writing or committing
+    the page file fails, the file is discarded with one warning and later pages are skipped, so extraction carries on.
+    """
+
+    def __init__(self, pdf_path: str, store_path: Optional[str]):
+        self.pdf_path = pdf_path
+        self._writer = None
+        if store_path:
+            try:
+                self._writer = page_store.writer(store_path)
+            except Exception as e:
+                self._fail(e)
+
+    def _fail(self, error: Exception):
+        print(f"⚠️ Could not store the pages of '{self.pdf_path}': {error}")
+        self.close()
+
+    def add(self, page: dict):
+        if self._writer:
+            try:
+                _add_paragraph_tokens(page)
+                self._writer.add(page["page"], page["text"], page["paragraph_tokens"])
+            except Exception as e:
+                self._fail(e)
+
+    def commit(self):
+        if self._writer:
+            try:
+                self._writer.commit()
+            except Exception as e:
+                self._fail(e)
+
+    def close(self):
+        writer, self._writer = self._writer, None
+        if writer:
+            try:
+                writer.close()
+            except Exception:
+                pass
+
+def iter_pages(pdf_path: str, workers: int = 1) -> Iterator[dict]:
+    """
+    Yields the text of each non-empty page of a PDF as soon as it is extracted.
+    With `workers` > 1, large documents are split into page ranges extracted by the shared process pool; pages are still yielded in order.
+    With the page store configured, a document extracted before is read back from its memory-mapped page file instead,
+    and a newly extracted one is written to it once every page has been read.
+    """
+    store_path = page_store.path_for(pdf_path, EXTRACTOR_VERSION)
+    stored = page_store.open(store_path) if store_path else None
+    if stored is not None:
+        with stored:
+            yield from stored
+        return
+
+    writer = _StoreWriter(pdf_path, store_path)
+    try:
+        for page in _extract_pages(pdf_path, workers):
+            writer.add(page)
+            yield page
+        writer.commit()
     except Exception as e:
         print(f"❌ Failed to process PDF '{pdf_path}': {e}")
-    return page_data
+    finally:
+        writer.close()
 
-def intelligent_chunking(pages: list[dict], token_limit: int = 3500) -> list[tuple[str, str]]:
+@tracer.traced("extraction")
+def extract_all_data_by_page(pdf_path: str, workers: int = 1) -> list[dict]:
+    """Extracts text from each page of a PDF."""
+    return list(iter_pages(pdf_path, workers))
+
+@tracer.traced("extraction")
+def extract_many(pdf_paths: list[str], workers: int = 1) -> list[list[dict]]:
     """
-    Chunks a document by semantic units (paragraphs) to preserve context.
-    Returns a list of tuples, where each tuple is (chunk_text, page_label).
+    Extracts several PDFs concurrently, sharing one process pool across all of their page ranges.
+    Returns one page list per input path, in the same order.
+    """
+    if workers <= 1:
+        return [extract_all_data_by_page(path) for path in pdf_paths]
+
+    results = [[] for _ in pdf_paths]
+    store_paths = [page_store.path_for(path, EXTRACTOR_VERSION) for path in pdf_paths]
+    tasks = []
+    for doc_index, path in enumerate(pdf_paths):
+        stored = page_store.open(store_paths[doc_index]) if store_paths[doc_index] else None
+        if stored is not None:
+            with stored:
+                results[doc_index] = list(stored)
+            store_paths[doc_index] = None  # already stored
+            continue
+        try:
+            tasks.extend((doc_index, path, start, stop) for start, stop in _page_ranges(_page_count(path), workers))
+        except Exception as e:
+            print(f"❌ Failed to process PDF '{path}': {e}")
+            store_paths[doc_index] = None
+
+    # The pool is only needed for documents the page store did not have.
+    executor = _process_pool(workers) if tasks else None
+    futures = [(doc_index, path, executor.submit(_extract_page_range, path, start, stop)) for doc_index, path, start, stop in tasks]
+    failed = set()
+    for doc_index, path, future in futures:
+        if doc_index in failed:
+            future.cancel()
+            continue
+        try:
+            results[doc_index].extend(future.result())
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                _discard_pool(executor)
+            print(f"❌ Failed to process PDF '{path}': {e}")
+            failed.add(doc_index)
+            results[doc_index] = []
+
+    for doc_index, store_path in enumerate(store_paths):
+        if store_path and doc_index not in failed:
+            writer = _StoreWriter(pdf_paths[doc_index], store_path)
+            try:
+                for page in results[doc_index]:
+                    writer.add(page)
+                writer.commit()
+            finally:
+                writer.close()
+    return results
+
+def _page_label(page_range: list[int]) -> str:
+    return f"{page_range[0]}-{page_range[1]}" if page_range[0] != page_range[1] else f"{page_range[0]}"
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+def split_sentences(paragraph: str) -> list[str]:
+    """Splits a paragraph at sentence ends, where the chunker cuts paragraphs too long for one chunk."""
+    return _SENTENCE_END.split(paragraph)
+
+def _split_paragraph(para: str, token_limit: int) -> list[tuple[str, int]]:
+    """Splits a paragraph longer than `token_limit` at sentence ends, cutting any overlong sentence by tokens."""
+    sentences = split_sentences(para)
+    pieces, current, current_tokens = [], [], 0
+    for sentence, tokens in zip(sentences, count_tokens_many(sentences)):
+        if tokens > token_limit:
+            parts = split_by_tokens(sentence, token_limit)
+            sentence_pieces = list(zip(parts, count_tokens_many(parts)))
+        else:
+            sentence_pieces = [(sentence, tokens)]
+        for piece, piece_tokens in sentence_pieces:
+            if current and current_tokens + piece_tokens + 1 > token_limit:
+                pieces.append((" ".join(current), current_tokens))
+                current, current_tokens = [], 0
+            current_tokens += piece_tokens + (1 if current else 0)
+            current.append(piece)
+    if current:
+        pieces.append((" ".join(current), current_tokens))
+    return pieces
+
+def iter_chunks(pages: Iterable[dict], token_limit: int = 3500) -> Iterator[tuple[str, str]]:
+    """
+    Chunks a stream of pages by semantic units (paragraphs) to preserve context.
+    Paragraphs are packed greedily up to `token_limit` (counting the separators between them);
+    a paragraph that alone exceeds it is split, so no chunk is ever larger than the limit.
+    Yields (chunk_text, page_label) tuples as soon as each chunk is complete, so only one chunk is buffered.
     """
-    chunks = []
     current_chunk = []
     current_tokens = 0
-    page_range = [pages[0]['page'], pages[0]['page']]
+    page_range = None
 
     for page in pages:
+        if page_range is None:
+            page_range = [page['page'], page['page']]
         page_range[1] = page['page']
         # Split text into paragraphs (or lines if no double newline)
-        paragraphs = re.split(r'\n\s*\n', page['text'])
-        
-        for para in paragraphs:
-            para_tokens = count_tokens(para)
-            if current_tokens + para_tokens > token_limit and current_chunk:
-                # Finalize the current chunk
-                chunk_text = "\n\n".join(current_chunk)
-                page_label = f"{page_range[0]}-{page_range[1]}" if page_range[0] != page_range[1] else f"{page_range[0]}"
-                chunks.append((chunk_text, page_label))
-                
-                # Start a new chunk
-                current_chunk = [para]
-                current_tokens = para_tokens
-                page_range = [page['page'], page['page']]
-            else:
-                current_chunk.append(para)
-                current_tokens += para_tokens
+        paragraphs = split_paragraphs(page['text'])
+        # Pages read from the page store carry their paragraph token counts; anything else is counted here.
+        paragraph_tokens = page.get("paragraph_tokens")
+        if paragraph_tokens is None or len(paragraph_tokens) != len(paragraphs):
+            paragraph_tokens = count_tokens_many(paragraphs)
+
+        for para, para_tokens in zip(paragraphs, paragraph_tokens):
+            pieces = [(para, para_tokens)] if para_tokens <= token_limit else _split_paragraph(para, token_limit)
+            for piece, piece_tokens in pieces:
+                if current_tokens + PARAGRAPH_SEPARATOR_TOKENS + piece_tokens > token_limit and current_chunk:
+                    # Finalize the current chunk
+                    yield "\n\n".join(current_chunk), _page_label(page_range)
+
+                    # Start a new chunk
+                    current_chunk = [piece]
+                    current_tokens = piece_tokens
+                    page_range = [page['page'], page['page']]
+                else:
+                    current_tokens += piece_tokens + (PARAGRAPH_SEPARATOR_TOKENS if current_chunk else 0)
+                    current_chunk.append(piece)
 
     # Add the last remaining chunk
     if current_chunk:
-        chunk_text = "\n\n".join(current_chunk)
-        page_label = f"{page_range[0]}-{page_range[1]}" if page_range[0] != page_range[1] else f"{page_range[0]}"
-        chunks.append((chunk_text, page_label))
-        
-    return chunks
\ No newline at end of file
+        yield "\n\n".join(current_chunk), _page_label(page_range)
+
+@tracer.traced("chunking")
+def intelligent_chunking(pages: list[dict], token_limit: int = 3500) -> list[tuple[str, str]]:
+    """
+    Chunks a document by semantic units (paragraphs) to preserve context.
+    Returns a list of tuples, where each tuple is (chunk_text, page_label).
+    """
+    return list(iter_chunks(pages, token_limit))
@@ -2,7 +2,10 @@
 
 import os
 import json
+import time
+from summarizer.tracing import tracer
 
+@tracer.traced("save")
 def save_summary(content: str, basename: str, output_dir: str):
     """Saves content to .txt and .md files."""
     os.makedirs(output_dir, exist_ok=True)
@@ -17,6 +20,63 @@ def save_summary(content: str, basename: str, output_dir: str):
     with open(md_path, "w", encoding="utf-8") as f:
         f.write(content)
 
+class SummaryStreamWriter:
+    """
+    Receives streamed output: writes it to <basename>.txt as it arrives and times the first token.
+    save_summary later overwrites the file with the final formatted content.
+    """
+
+    def __init__(self, basename: str, output_dir: str, on_update=None):
+        os.makedirs(output_dir, exist_ok=True)
+        self.path = os.path.join(output_dir, f"{basename}.txt")
+        self.on_update = on_update
+        self.text = ""
+        self.started = None
+        self.first_token_at = None
+        self.finished = None
+        self._file = None
+
+    def reset(self):
+        """Starts a new attempt, discarding any partial output from a failed one."""
+        self.text = ""
+        self.started = time.perf_counter()
+        self.first_token_at = None
+        if self._file:
+            self._file.seek(0)
+            self._file.truncate()
+
+    def write(self, token: str):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        if self._file is None:
+            self._file = open(self.path, "w", encoding="utf-8")
+        self.text += token
+        self._file.write(token)
+        self._file.flush()
+        if self.on_update:
+            self.on_update(self.text)
+
+    @property
+    def time_to_first_token(self):
+        """Seconds from the start of the successful attempt to its first token, or None."""
+        if self.started is None or self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started
+
+    @property
+    def elapsed(self):
+        """Seconds from the start of the successful attempt until the writer was closed, or None."""
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+    def close(self):
+        if self.started is not None:
+            self.finished = time.perf_counter()
+        if self._file:
+            self._file.close()
+            self._file = None
+
 def format_json_output(content: str, task: str) -> str:
     """Formats JSON string output into human-readable markdown."""
     try:
@@ -1,11 +1,54 @@
 # PDF SUMMARIZER AI/summarizer/generator.py
 
+import contextvars
 import json
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Callable, Iterable, Iterator, Optional
+import httpx
 from openai import OpenAI, APIError, RateLimitError, APIConnectionError
+from summarizer.extractor import intelligent_chunking
+from summarizer.cache import response_cache, make_cache_key
+from summarizer.parser import count_tokens, count_tokens_many
+from summarizer.ratelimit import rate_limiter
+from summarizer.structured import StructuredMerger, parse_structured, repair_json
+from summarizer.tracing import tracer
 
-def get_prompt(prompts_data: dict, task: str, chunk: str, word_count: int, page_label: str) -> tuple[str, str]:
-    """Constructs the system and user prompts for a given task."""
+TEMPERATURE = 0.1
+MAX_OUTPUT_TOKENS = 4000
+
+USER_PROMPT_PREFIX = "Source page(s): {page_label}\n\nInitiate protocol on the following data stream:\n\n"
+PROMPT_OVERHEAD_TOKENS = 32  # chat message framing, plus a margin for joins that tokenize differently
+
+class IncompleteStreamError(Exception):
+    """A streamed response that ended without a finish_reason; it is retried like a dropped connection."""
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """A protocol's prompts assembled once from prompts.json, with their fixed token costs precomputed."""
+    task: str
+    system_prompt: str  # without the word-limit instruction
+    word_limit_instruction: str
+    system_tokens: int
+    word_limit_tokens: int  # upper bound over any word count
+    user_prefix_tokens: int  # upper bound over any page label
+    structure: Optional[dict] = None  # the JSON shape replies must follow, if the protocol defines one
+
+    def render(self, chunk: str, word_count: int, page_label: str) -> tuple[str, str]:
+        system_prompt = self.system_prompt
+        if word_count:
+            system_prompt = f"{system_prompt}\n{self.word_limit_instruction.format(word_count=word_count)}"
+        return system_prompt, USER_PROMPT_PREFIX.format(page_label=page_label) + chunk
+
+class CompiledPrompts(dict):
+    """The prompts.json mapping, plus an immutable PromptTemplate per protocol in `templates`."""
+    templates: MappingProxyType
+
+def compile_template(prompts_data: dict, task: str, model_name: str = "llama-3.3-70b-versatile") -> PromptTemplate:
+    """Builds the system prompt for a task and counts its tokens."""
     genesis_directive = prompts_data.get("genesis_directive", "")
     protocol = prompts_data.get("protocols", {}).get(task, {})
     
@@ -18,71 +61,411 @@ def get_prompt(prompts_data: dict, task: str, chunk: str, word_count: int, page_
     if "structure" in protocol:
         structure = json.dumps(protocol.get("structure", {}), indent=2)
         system_prompt_parts.append(f"\nYOUR OUTPUT MUST BE IN THIS EXACT JSON STRUCTURE:\n{structure}")
-        
-    if word_count:
-        system_prompt_parts.append(prompts_data.get("word_limit_instruction", "").format(word_count=word_count))
 
     system_prompt = "\n".join(system_prompt_parts)
-    user_prompt = f"Source page(s): {page_label}\n\nInitiate protocol on the following data stream:\n\n{chunk}"
-    return system_prompt, user_prompt
+    word_limit_instruction = prompts_data.get("word_limit_instruction", "")
+    system_tokens, word_limit_tokens, user_prefix_tokens = count_tokens_many(
+        [system_prompt, "\n" + word_limit_instruction.format(word_count=999999), USER_PROMPT_PREFIX.format(page_label="99999-99999")], model_name)
+    return PromptTemplate(task, system_prompt, word_limit_instruction, system_tokens, word_limit_tokens, user_prefix_tokens, protocol.get("structure"))
 
-def send_request_with_retry(client: OpenAI, model_name: str, messages: list, max_retries: int, retry_delay: int, is_json: bool) -> str:
-    """Sends a request to the LLM with exponential backoff retry logic."""
-    for attempt in range(max_retries):
-        try:
-            response_format = {"type": "json_object"} if is_json else {"type": "text"}
-            response = client.chat.completions.create(
-                model=model_name,
-                messages=messages,
-                temperature=0.1,
-                max_tokens=4000,
-                response_format=response_format
-            )
-            return response.choices[0].message.content.strip()
-        except (RateLimitError, APIError, APIConnectionError) as e:
-            print(f"⚠️ API Error on attempt {attempt + 1}/{max_retries}: {e}. Retrying in {retry_delay}s...")
-            time.sleep(retry_delay * (attempt + 1))
-        except Exception as e:
-            print(f"❌ An unexpected error occurred: {e}")
-            return '{"error": "An unexpected error occurred."}' if is_json else "Error: An unexpected error occurred."
-    
-    return '{"error": "API operation failed after multiple retries."}' if is_json else "Error: API operation failed after all retries."
+def compile_prompts(prompts_data: dict, model_name: str = "llama-3.3-70b-versatile") -> CompiledPrompts:
+    """Compiles every protocol in prompts.json once, so prompts are not rebuilt for each chunk."""
+    compiled = CompiledPrompts(prompts_data)
+    compiled.templates = MappingProxyType({task: compile_template(prompts_data, task, model_name) for task in prompts_data.get("protocols", {})})
+    return compiled
+
+def get_template(prompts_data: dict, task: str) -> PromptTemplate:
+    """Returns the precompiled template, compiling on the fly for plain (uncompiled) prompt mappings; resolve it once per batch of calls."""
+    templates = getattr(prompts_data, "templates", None)
+    if templates is not None and task in templates:
+        return templates[task]
+    return compile_template(prompts_data, task)
+
+def get_prompt(prompts_data: dict, task: str, chunk: str, word_count: int, page_label: str) -> tuple[str, str]:
+    """Constructs the system and user prompts for a given task."""
+    return get_template(prompts_data, task).render(chunk, word_count, page_label)
+
+def chunk_token_budget(prompts_data: dict, task: str, context_window: int, output_reserve: int = MAX_OUTPUT_TOKENS) -> int:
+    """
+    Largest chunk, in tokens, whose `task` prompt still fits `context_window` with `output_reserve` tokens left for the reply.
+    Raises ValueError if the prompt alone leaves no room.
+    """
+    template = get_template(prompts_data, task)
+    fixed_tokens = template.system_tokens + template.word_limit_tokens + template.user_prefix_tokens + PROMPT_OVERHEAD_TOKENS
+    budget = context_window - output_reserve - fixed_tokens
+    if budget <= 0:
+        raise ValueError(f"A {context_window}-token context window cannot fit the '{task}' prompt ({fixed_tokens} tokens) and {output_reserve} output tokens.")
+    return budget
+
+def record_usage(span, model_name: str, usage):
+    """Adds a response's token usage and its cost under the configured prices to an llm_call span."""
+    span.set(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens,
+             cost_usd=tracer.cost(model_name, usage.prompt_tokens, usage.completion_tokens))
+
+def _request_with_retry(model_name: str, messages: list, max_retries: int, retry_delay: int, is_json: bool, attempt: Callable,
+                        use_cache: bool = True, on_cache_hit: Optional[Callable[[str], None]] = None, **span_attrs) -> str:
+    """
+    The cache lookup, rate limiting and jittered exponential backoff shared by every LLM request.
+    `attempt(response_format)` makes one API call and returns (content, usage, response headers).
+    """
+    response_format = {"type": "json_object"} if is_json else {"type": "text"}
+    with tracer.span("llm_call", model=model_name, **span_attrs) as span:
+        cache_key = make_cache_key(model_name, messages, TEMPERATURE, response_format)
+        cached = response_cache.get(cache_key) if use_cache else None
+        if cached is not None:
+            span.set(cache_hit=1)
+            if on_cache_hit:
+                on_cache_hit(cached)
+            return cached
+
+        limiter = rate_limiter.for_model(model_name)
+        prompt_tokens = sum(count_tokens(message["content"], model_name) for message in messages)
+        for attempt_number in range(max_retries):
+            try:
+                span.add(queue_wait=limiter.acquire(prompt_tokens))
+                content, usage, headers = attempt(response_format)
+                limiter.update_from_headers(headers)
+                if usage:
+                    limiter.record_usage(prompt_tokens, usage.total_tokens)
+                    record_usage(span, model_name, usage)
+                content = content.strip()
+                response_cache.set(cache_key, content)
+                return content
+            except (RateLimitError, APIError, APIConnectionError, httpx.TransportError, IncompleteStreamError) as e:
+                headers = getattr(getattr(e, "response", None), "headers", None)
+                limiter.update_from_headers(headers)
+                if attempt_number + 1 == max_retries:
+                    print(f"⚠️ API Error on attempt {attempt_number + 1}/{max_retries}: {e}.")
+                    break
+                delay = limiter.backoff_delay(attempt_number, retry_delay, headers)
+                span.add(retries=1, backoff=delay)
+                print(f"⚠️ API Error on attempt {attempt_number + 1}/{max_retries}: {e}. Retrying in {delay:.1f}s...")
+                time.sleep(delay)
+            except Exception as e:
+                print(f"❌ An unexpected error occurred: {e}")
+                span.set(failed=1)
+                return '{"error": "An unexpected error occurred."}' if is_json else "Error: An unexpected error occurred."
+
+        span.set(failed=1)
+        return '{"error": "API operation failed after multiple retries."}' if is_json else "Error: API operation failed after all retries."
+
+def send_request_with_retry(client: OpenAI, model_name: str, messages: list, max_retries: int, retry_delay: int, is_json: bool, use_cache: bool = True) -> str:
+    """
+    Sends a request to the LLM with jittered exponential backoff retry logic.
+    Every attempt is paced through the model's rate limiter, which learns from the response headers.
+    Successful responses are served from and stored in the shared response cache; with `use_cache=False`
+    the lookup is skipped (e.g. to replace a cached reply that failed validation) but the new reply is still stored.
+    """
+    def attempt(response_format: dict):
+        raw_response = client.chat.completions.with_raw_response.create(
+            model=model_name,
+            messages=messages,
+            temperature=TEMPERATURE,
+            max_tokens=MAX_OUTPUT_TOKENS,
+            response_format=response_format
+        )
+        response = raw_response.parse()
+        return response.choices[0].message.content, response.usage, raw_response.headers
+
+    return _request_with_retry(model_name, messages, max_retries, retry_delay, is_json, attempt, use_cache)
+
+def stream_request_with_retry(client: OpenAI, model_name: str, messages: list, max_retries: int, retry_delay: int, is_json: bool, stream,
+                              use_cache: bool = True) -> str:
+    """
+    Streaming counterpart of send_request_with_retry. `stream` is any object with write(text) and reset():
+    reset() is called as each attempt starts, so text from a stream that failed part-way (including one that closed
+    without a finish_reason) is discarded before the request is retried with the same backoff. Returns the complete text.
+    """
+    def attempt(response_format: dict):
+        stream.reset()
+        raw_response = client.chat.completions.with_raw_response.create(
+            model=model_name,
+            messages=messages,
+            temperature=TEMPERATURE,
+            max_tokens=MAX_OUTPUT_TOKENS,
+            response_format=response_format,
+            stream=True
+        )
+        parts, usage, finish_reason = [], None, None
+        for chunk in raw_response.parse():
+            usage = getattr(chunk, "usage", None) or usage
+            if chunk.choices:
+                finish_reason = chunk.choices[0].finish_reason or finish_reason
+                if chunk.choices[0].delta.content:
+                    token = chunk.choices[0].delta.content
+                    parts.append(token)
+                    stream.write(token)
+        if finish_reason is None:
+            # The server closed the stream cleanly but mid-answer; the partial text must not be returned or cached.
+            raise IncompleteStreamError("stream ended without a finish_reason")
+        return "".join(parts), usage, raw_response.headers
 
-def process_chunks(client, model_name, prompts_data, max_retries, retry_delay, chunks: list[tuple[str, str]], task: str, word_count: int) -> list[str]:
-    """Processes a list of text chunks based on the selected task."""
-    summaries = []
+    def replay(cached: str):
+        stream.reset()
+        stream.write(cached)
+
+    return _request_with_retry(model_name, messages, max_retries, retry_delay, is_json, attempt, use_cache, on_cache_hit=replay, streamed=1)
+
+def request_structured(client: OpenAI, model_name: str, messages: list, max_retries: int, retry_delay: int, structure: dict,
+                       escalation_model: Optional[str] = None) -> str:
+    """
+    Sends a JSON-mode request and validates the reply against the protocol `structure` straight away.
+    Malformed or truncated replies are repaired locally when possible; otherwise this one request is sent again,
+    to `escalation_model` if it names a different (larger) model, or else to the same model bypassing the cache.
+    Returns normalized JSON, or an error placeholder if no usable reply was obtained.
+    """
+    escalate = bool(escalation_model) and escalation_model != model_name
+    content = send_request_with_retry(client, model_name, messages, max_retries, retry_delay, is_json=True)
+    if is_error_response(content) and not escalate:
+        return content
+    with tracer.span("json_validation") as span:
+        data = None if is_error_response(content) else parse_structured(content, structure)
+        if data is None and escalate:
+            print(f"⚠️ Unusable JSON response from {model_name}; escalating this chunk to {escalation_model}.")
+            span.set(escalated=1)
+            content = send_request_with_retry(client, escalation_model, messages, max_retries, retry_delay, is_json=True)
+            data = None if is_error_response(content) else parse_structured(content, structure)
+        elif data is None:
+            print("⚠️ Invalid JSON response could not be repaired; re-requesting this chunk.")
+            span.set(rerequested=1)
+            content = send_request_with_retry(client, model_name, messages, max_retries, retry_delay, is_json=True, use_cache=False)
+            data = None if is_error_response(content) else parse_structured(content, structure)
+        if data is None:
+            span.set(failed=1)
+            return '{"error": "Response did not match the expected JSON structure."}'
+    return json.dumps(data, ensure_ascii=False)
+
+def ordered_map(fn: Callable, items: Iterable, max_workers: int) -> Iterator:
+    """
+    Maps `fn` over `items` on a thread pool, yielding results in input order.
+    Items are pulled lazily, so at most about 2 x `max_workers` of them are held at any time.
+    """
+    if max_workers <= 1:
+        yield from map(fn, items)
+        return
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        for item in items:
+            # Each task runs in a copy of the caller's context, so tracing attributes it to the caller's stage.
+            pending.append(executor.submit(contextvars.copy_context().run, fn, item))
+            if len(pending) >= 2 * max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def process_chunks(client, model_name, prompts_data, max_retries, retry_delay, chunks: Iterable[tuple[str, str]], task: str, word_count: int, max_workers: int = 1,
+                   completed: Optional[dict[int, str]] = None, on_chunk_done: Optional[Callable[[int, str], None]] = None,
+                   escalation_model: Optional[str] = None) -> list[str]:
+    """
+    Processes text chunks based on the selected task.
+    `chunks` may be a lazy stream; each chunk is dispatched as soon as it arrives, with up to
+    `max_workers` requests in flight. Results are returned in chunk order.
+    Chunks whose index is in `completed` reuse that result instead of calling the LLM, and
+    `on_chunk_done(index, result)` is called (from worker threads) as each new result arrives.
+    JSON replies that fail validation are re-sent to `escalation_model`, if given; see request_structured.
+    """
     # For the initial extraction, we don't pass the word count.
     wc = None if task == 'research_summary' else word_count
-    for chunk_text, page_label in chunks:
-        system_prompt, user_prompt = get_prompt(prompts_data, task, chunk_text, wc, page_label)
+    completed = completed or {}
+    # Resolved once per call, so an uncompiled prompts mapping is not recompiled for every chunk.
+    template = get_template(prompts_data, task)
+
+    def process_one(indexed_chunk: tuple[int, tuple[str, str]]) -> str:
+        index, (chunk_text, page_label) = indexed_chunk
+        if index in completed:
+            return completed[index]
+        system_prompt, user_prompt = template.render(chunk_text, wc, page_label)
         messages = [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}]
         is_json = "JSON" in system_prompt
-        summary = send_request_with_retry(client, model_name, messages, max_retries, retry_delay, is_json)
-        summaries.append(summary)
-    return summaries
+        if is_json and template.structure:
+            result = request_structured(client, model_name, messages, max_retries, retry_delay, template.structure, escalation_model)
+        else:
+            result = send_request_with_retry(client, model_name, messages, max_retries, retry_delay, is_json)
+        if on_chunk_done:
+            on_chunk_done(index, result)
+        return result
+
+    return list(ordered_map(process_one, enumerate(chunks), max_workers))
+
+def is_error_response(text: str) -> bool:
+    """True for the placeholder strings send_request_with_retry returns when a request fails."""
+    if not text or text.startswith("Error:"):
+        return True
+    if text.startswith('{"error"'):
+        try:
+            return set(json.loads(text)) == {"error"}
+        except json.JSONDecodeError:
+            return False
+    return False
+
+def failed_chunks_response(failed: int) -> str:
+    """The placeholder returned instead of a merged result when the caller requires every chunk to succeed."""
+    return f"Error: {failed} chunk(s) failed; the merge stage was skipped."
+
+def merge_page_labels(labels: list[str]) -> str:
+    """Combines consecutive page labels ('1-3', '4', '5-9') into one covering label ('1-9')."""
+    first, last = labels[0].split("-")[0], labels[-1].split("-")[-1]
+    return first if first == last else f"{first}-{last}"
+
+def group_by_token_budget(items: list[tuple[str, str]], token_budget: int, fan_in: int, model_name: str) -> list[list[tuple[str, str]]]:
+    """
+    Greedily groups consecutive (text, page_label) items into groups of at most `fan_in` items within `token_budget` tokens.
+    A group always takes at least two items when available, so every reduction level shrinks.
+    """
+    token_counts = count_tokens_many([text for text, _ in items], model_name)
+    groups, current, current_tokens = [], [], 0
+    for item, tokens in zip(items, token_counts):
+        if len(current) >= 2 and (len(current) >= fan_in or current_tokens + tokens > token_budget):
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(item)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
 
+def reduce_summaries(client, model_name, prompts_data, max_retries, retry_delay, summaries: list[tuple[str, str]], task: str, word_count: int, fan_in: int = 4, token_budget: int = 3500, max_workers: int = 1) -> str:
+    """
+    Tree-reduces (summary, page_label) pairs with the `task` protocol until a single summary remains.
+    Each level runs its groups concurrently, so n summaries take O(log n) rounds.
+    A merge that fails is not passed up: its inputs are carried to the next level and regrouped there.
+    If every merge of a level fails, the failure placeholder is returned.
+    """
+    level = [item for item in summaries if not is_error_response(item[0])]
+    if not level:
+        return summaries[0][0] if summaries else ""
+    fan_in = max(fan_in, 2)
+
+    while len(level) > 1:
+        groups = group_by_token_budget(level, token_budget, fan_in, model_name)
+        merges = [
+            ("\n\n---\n\n".join(f"[Summary of page(s) {label}]\n{text}" for text, label in group), merge_page_labels([label for _, label in group]))
+            for group in groups if len(group) > 1
+        ]
+        merged = iter(process_chunks(client, model_name, prompts_data, max_retries, retry_delay, merges, task, word_count, max_workers))
+        next_level, failure = [], None
+        for group in groups:
+            if len(group) == 1:
+                # A trailing single-item group is carried up to the next level unchanged.
+                next_level.append(group[0])
+                continue
+            result = next(merged)
+            if is_error_response(result):
+                failure = result
+                next_level.extend(group)
+            else:
+                next_level.append((result, merge_page_labels([label for _, label in group])))
+        if len(next_level) == len(level):
+            print("⚠️ Every merge at this level failed; giving up on the reduction.")
+            return failure
+        if failure:
+            print("⚠️ Some merges failed; their inputs are carried to the next level.")
+        level = next_level
+    return level[0][0]
+
+def tree_summarize(client, model_name, prompts_data, max_retries, retry_delay, chunks: Iterable[tuple[str, str]], task: str, merge_task: str, word_count: int, fan_in: int = 4, token_budget: int = 3500, max_workers: int = 1,
+                   completed: Optional[dict[int, str]] = None, on_chunk_done: Optional[Callable[[int, str], None]] = None,
+                   reduce_model_name: Optional[str] = None, require_all_chunks: bool = False) -> str:
+    """
+    Summarizes every chunk with `task` on `model_name`, then tree-reduces the chunk summaries with `merge_task`
+    on `reduce_model_name` (default: the same model) into one.
+    `completed` and `on_chunk_done` apply to the chunk stage, as in process_chunks.
+    With `require_all_chunks`, a failed chunk skips the reduce stage and an error placeholder is returned.
+    """
+    reduce_model_name = reduce_model_name or model_name
+    page_labels = []
+
+    def track_labels(chunks):
+        for chunk in chunks:
+            page_labels.append(chunk[1])
+            yield chunk
+
+    with tracer.span("map"):
+        summaries = process_chunks(client, model_name, prompts_data, max_retries, retry_delay, track_labels(chunks), task, word_count, max_workers, completed, on_chunk_done,
+                                   escalation_model=reduce_model_name)
+    if require_all_chunks:
+        failed = sum(is_error_response(summary) for summary in summaries)
+        if failed:
+            return failed_chunks_response(failed)
+    with tracer.span("reduce"):
+        return reduce_summaries(client, reduce_model_name, prompts_data, max_retries, retry_delay, list(zip(summaries, page_labels)), merge_task, word_count, fan_in, token_budget, max_workers)
+
+def compare_documents(client, model_name, prompts_data, max_retries, retry_delay, documents: list[tuple[str, list[dict]]], word_count: int, token_budget: int = 3500, chunk_token_limit: int = 3500, fan_in: int = 4, max_workers: int = 1,
+                      reduce_model_name: Optional[str] = None) -> str:
+    """
+    Runs the multi_doc_compare protocol over any number of (document_name, pages) pairs.
+    Each document gets an equal share of `token_budget`; documents that exceed their share are chunked,
+    condensed concurrently with the document_digest protocol on `model_name` and tree-reduced to a single digest first.
+    The digest merges and the comparison itself run on `reduce_model_name` (default: the same model).
+    """
+    reduce_model_name = reduce_model_name or model_name
+    doc_budget = max(token_budget // len(documents), 1)
+    # Roughly 0.75 words per token keeps each digest inside its share of the budget.
+    digest_words = max(int(doc_budget * 0.75), 50)
+
+    doc_chunks = [intelligent_chunking(pages, chunk_token_limit) if pages else [] for _, pages in documents]
+    doc_texts = ["\n\n".join(text for text, _ in chunks) for chunks in doc_chunks]
+    needs_digest = [tokens > doc_budget for tokens in count_tokens_many(doc_texts, model_name)]
+
+    # Map stage: every chunk of every oversized document, in one concurrent batch.
+    map_inputs = [
+        (f"Document: {name}\n\n{text}", label)
+        for (name, _), chunks, digest in zip(documents, doc_chunks, needs_digest) if digest
+        for text, label in chunks
+    ]
+    with tracer.span("map"):
+        map_outputs = iter(process_chunks(client, model_name, prompts_data, max_retries, retry_delay, map_inputs, "document_digest", digest_words, max_workers,
+                                          escalation_model=reduce_model_name))
+    doc_summaries = [
+        [(next(map_outputs), label) for _, label in chunks] if digest else []
+        for chunks, digest in zip(doc_chunks, needs_digest)
+    ]
+
+    # Reduce stage: one digest per document, documents in parallel.
+    def condense(index: int) -> str:
+        if not needs_digest[index]:
+            return doc_texts[index]
+        return reduce_summaries(client, reduce_model_name, prompts_data, max_retries, retry_delay, doc_summaries[index], "document_digest", digest_words, fan_in, chunk_token_limit)
+
+    with tracer.span("reduce"):
+        digests = list(ordered_map(condense, range(len(documents)), max_workers))
+    comparison_input = "\n\n".join(f"--- DOCUMENT: {name} ---\n{digest}" for (name, _), digest in zip(documents, digests))
+    with tracer.span("compare"):
+        return process_chunks(client, reduce_model_name, prompts_data, max_retries, retry_delay, [(comparison_input, "Multiple Docs")], "multi_doc_compare", word_count)[0]
+
+@tracer.traced("json_merge")
 def synthesize_chunks(summaries: list[str], task: str) -> str:
-    """Synthesizes multiple processed chunks. For JSON, it merges them."""
+    """
+    Synthesizes multiple processed chunks. For JSON, it merges them incrementally, repairing replies where possible,
+    skipping unusable ones and folding repeated list items (e.g. the same key finding from overlapping chunks) together.
+    """
     if not summaries: return ""
     if len(summaries) == 1: return summaries[0]
 
     if task in ["research_summary", "multi_doc_compare"]:
-        try:
-            master_obj = json.loads(summaries[0])
-            for summary_str in summaries[1:]:
-                child_obj = json.loads(summary_str)
-                for key, value in master_obj.items():
-                    if isinstance(value, list) and key in child_obj and isinstance(child_obj[key], list):
-                        value.extend(child_obj[key])
-            return json.dumps(master_obj, indent=2)
-        except (json.JSONDecodeError, TypeError) as e:
-            print(f"⚠️ Could not merge JSON objects: {e}. Returning raw text.")
-            return "\n\n---\n\n".join(summaries)
+        merger = StructuredMerger()
+        skipped = 0
+        for summary_str in summaries:
+            data = None if is_error_response(summary_str) else repair_json(summary_str)
+            if data is None:
+                skipped += 1
+                continue
+            merger.add(data)
+        if skipped:
+            print(f"⚠️ Skipped {skipped} of {len(summaries)} chunk result(s) that were not usable JSON.")
+        if merger.merged:
+            return json.dumps(merger.result, indent=2)
+        print("⚠️ Could not merge JSON objects: no usable chunk results. Returning raw text.")
+        return "\n\n---\n\n".join(summaries)
     
     return "\n\n---\n\n".join(summaries)
 
-def final_synthesis_task(client, model_name, prompts_data, max_retries, retry_delay, structured_data_json: str, word_count: int, foresight_mode: bool = False) -> str:
-    """Performs the final synthesis from structured data to a narrative summary or the cognitive foresight task."""
+@tracer.traced("final_synthesis")
+def final_synthesis_task(client, model_name, prompts_data, max_retries, retry_delay, structured_data_json: str, word_count: int, foresight_mode: bool = False, stream=None) -> str:
+    """
+    Performs the final synthesis from structured data to a narrative summary or the cognitive foresight task.
+    With `stream`, the output is written to it as it is generated; see stream_request_with_retry.
+    """
     
     task = "cognitive_foresight" if foresight_mode else "final_synthesis"
     
@@ -92,5 +475,7 @@ def final_synthesis_task(client, model_name, prompts_data, max_retries, retry_de
     system_prompt, user_prompt = get_prompt(prompts_data, task, structured_data_json, wc, "Entire Document")
     messages = [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}]
     
+    if stream is not None:
+        return stream_request_with_retry(client, model_name, messages, max_retries, retry_delay, is_json, stream)
     final_output = send_request_with_retry(client, model_name, messages, max_retries, retry_delay, is_json=is_json)
     return final_output
\ No newline at end of file
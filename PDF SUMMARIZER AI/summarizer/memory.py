@@ -1,40 +1,178 @@
 # PDF SUMMARIZER AI/summarizer/memory.py
 
+import hashlib
+import os
+import sqlite3
 import numpy as np
 import faiss
-from sentence_transformers import SentenceTransformer
-from typing import List, Dict
+from typing import List, Dict, Optional
+from summarizer.embeddings import EmbeddingCache
 
 class MemoryManager:
-    def __init__(self, model_name='all-MiniLM-L6-v2'):
-        try:
-            self.model = SentenceTransformer(model_name)
-            self.dimension = self.model.get_sentence_embedding_dimension()
-            self.index = faiss.IndexFlatIP(self.dimension)
-            self.stored_chunks: List[Dict[str, str]] = []
-            print(f"✅ Memory Manager initialized with model '{model_name}'.")
-        except Exception as e:
-            raise RuntimeError(f"❌ Failed to initialize SentenceTransformer. Error: {e}")
-
-    def add_document_chunks(self, chunks: List[str], doc_name: str):
-        if not self.model or not chunks: return
-        embeddings = self.model.encode(chunks, convert_to_numpy=True)
-        faiss.normalize_L2(embeddings)
-        self.index.add(embeddings)
-        for chunk in chunks:
-            self.stored_chunks.append({"document_name": doc_name, "chunk_text": chunk})
+    """
+    Cross-document vector memory. With `persist_dir`, the FAISS index and chunk metadata survive restarts
+    and documents are keyed by content hash so already-embedded ones are skipped.
+    Search is exact until the index holds `ann_threshold` vectors, then switches to an IVF index.
+    The embedding model is loaded on first use, and embeddings are served from a hash-keyed cache when possible.
+    """
 
-    def search_relevant_context(self, query_chunk: str, k: int = 3, threshold: float = 0.5) -> str:
-        if not self.model or self.index.ntotal == 0: return ""
-        query_embedding = self.model.encode([query_chunk], convert_to_numpy=True)
-        faiss.normalize_L2(query_embedding)
-        distances, indices = self.index.search(query_embedding, k)
-        relevant_context = []
-        for i, dist in enumerate(distances[0]):
-            if dist >= threshold:
-                idx = indices[0][i]
-                if idx < len(self.stored_chunks):
-                    context = self.stored_chunks[idx]
+    ANN_THRESHOLD = 50_000
+    ANN_NPROBE = 16
+
+    def __init__(self, model_name='all-MiniLM-L6-v2', persist_dir: Optional[str] = None, ann_threshold: int = ANN_THRESHOLD,
+                 encode_batch_size: int = 32, embedding_cache_size: int = 100_000):
+        self.model_name = model_name
+        self._model = None
+        self.encode_batch_size = encode_batch_size
+        self.embedding_cache = EmbeddingCache(model_name, os.path.join(persist_dir, "embeddings") if persist_dir else None, embedding_cache_size)
+        self.ann_threshold = ann_threshold
+        self.persist_dir = persist_dir
+        self.index = None  # created on first add, or loaded from persist_dir
+        self.stored_chunks: Dict[int, Dict[str, str]] = {}
+        self.documents: Dict[str, Dict] = {}  # content hash -> {"document_name", "ids"}
+        self.next_id = 0
+        self._db = None
+        if persist_dir:
+            self._load()
+        print(f"✅ Memory Manager initialized with model '{model_name}'.")
+
+    @property
+    def model(self):
+        """The SentenceTransformer, loaded on first use so runs that never embed skip the load."""
+        if self._model is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+                self._model = SentenceTransformer(self.model_name)
+            except Exception as e:
+                raise RuntimeError(f"❌ Failed to initialize SentenceTransformer. Error: {e}")
+        return self._model
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Returns L2-normalized float32 embeddings, encoding only the texts missing from the cache."""
+        cached = self.embedding_cache.get_many(texts)
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+        if missing:
+            fresh = self.model.encode([texts[i] for i in missing], batch_size=self.encode_batch_size, convert_to_numpy=True).astype(np.float32)
+            faiss.normalize_L2(fresh)
+            self.embedding_cache.put_many([texts[i] for i in missing], fresh)
+            self.embedding_cache.flush()
+            for i, vector in zip(missing, fresh):
+                cached[i] = vector
+        return np.vstack(cached).astype(np.float32)
+
+    @staticmethod
+    def document_hash(chunks: List[str]) -> str:
+        return hashlib.sha256("\0".join(chunks).encode("utf-8")).hexdigest()
+
+    def add_document_chunks(self, chunks: List[str], doc_name: str) -> bool:
+        """Embeds and stores a document's chunks. Returns False if this exact content is already stored."""
+        if not chunks: return False
+        doc_hash = self.document_hash(chunks)
+        if doc_hash in self.documents:
+            return False
+        embeddings = self.encode(chunks)
+        if self.index is None:
+            self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(embeddings.shape[1]))
+        ids = np.arange(self.next_id, self.next_id + len(chunks), dtype=np.int64)
+        self.next_id += len(chunks)
+        self.index.add_with_ids(embeddings, ids)
+        for chunk_id, chunk in zip(ids.tolist(), chunks):
+            self.stored_chunks[chunk_id] = {"document_name": doc_name, "chunk_text": chunk}
+        self.documents[doc_hash] = {"document_name": doc_name, "ids": ids.tolist()}
+        if isinstance(self.index, faiss.IndexIDMap2) and self.index.ntotal >= self.ann_threshold:
+            self._switch_to_ann()
+        self._save_document(doc_hash, doc_name, ids.tolist(), chunks)
+        return True
+
+    def remove_document(self, doc_name: str) -> int:
+        """Removes every stored document with this name. Returns the number of chunks removed."""
+        doomed = [doc_hash for doc_hash, doc in self.documents.items() if doc["document_name"] == doc_name]
+        removed = 0
+        for doc_hash in doomed:
+            ids = self.documents.pop(doc_hash)["ids"]
+            self.index.remove_ids(np.array(ids, dtype=np.int64))
+            for chunk_id in ids:
+                self.stored_chunks.pop(chunk_id, None)
+            removed += len(ids)
+            if self._db:
+                self._db.execute("DELETE FROM chunks WHERE doc_hash = ?", (doc_hash,))
+                self._db.execute("DELETE FROM documents WHERE doc_hash = ?", (doc_hash,))
+        if doomed and self._db:
+            self._db.commit()
+            self._write_index()
+        return removed
+
+    def search_relevant_contexts(self, query_chunks: List[str], k: int = 3, threshold: float = 0.5) -> List[str]:
+        """Batched form of search_relevant_context: one encode and one index search for all queries."""
+        if self.index is None or self.index.ntotal == 0 or not query_chunks: return ["" for _ in query_chunks]
+        query_embeddings = self.encode(query_chunks)
+        distances, indices = self.index.search(query_embeddings, k)
+        results = []
+        for query_chunk, row_distances, row_indices in zip(query_chunks, distances, indices):
+            relevant_context = []
+            for dist, idx in zip(row_distances, row_indices):
+                if dist >= threshold and int(idx) in self.stored_chunks:
+                    context = self.stored_chunks[int(idx)]
                     if context["chunk_text"] != query_chunk:
                         relevant_context.append(f"From '{context['document_name']}':\n...{context['chunk_text'][:250]}...")
-        return "\n\n---\n\n".join(relevant_context) if relevant_context else ""
\ No newline at end of file
+            results.append("\n\n---\n\n".join(relevant_context) if relevant_context else "")
+        return results
+
+    def search_relevant_context(self, query_chunk: str, k: int = 3, threshold: float = 0.5) -> str:
+        return self.search_relevant_contexts([query_chunk], k, threshold)[0]
+
+    def _switch_to_ann(self):
+        """Rebuilds the exact index as an IVF index trained on the vectors stored so far."""
+        ids = faiss.vector_to_array(self.index.id_map).astype(np.int64)
+        vectors = faiss.downcast_index(self.index.index).reconstruct_n(0, self.index.ntotal)
+        nlist = int(4 * np.sqrt(len(ids)))
+        quantizer = faiss.IndexFlatIP(self.index.d)
+        index = faiss.IndexIVFFlat(quantizer, self.index.d, nlist, faiss.METRIC_INNER_PRODUCT)
+        index.train(vectors)
+        index.add_with_ids(vectors, ids)
+        index.nprobe = self.ANN_NPROBE
+        self.index = index
+
+    # --- Persistence -------------------------------------------------------
+
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.persist_dir, "memory.faiss")
+
+    def _load(self):
+        os.makedirs(self.persist_dir, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(self.persist_dir, "memory.sqlite3"))
+        self._db.execute("CREATE TABLE IF NOT EXISTS documents (doc_hash TEXT PRIMARY KEY, document_name TEXT NOT NULL)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS chunks (id INTEGER PRIMARY KEY, doc_hash TEXT NOT NULL, chunk_text TEXT NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS chunks_doc_hash ON chunks (doc_hash)")
+        self._db.commit()
+        if not os.path.exists(self._index_path):
+            # Metadata without vectors is useless; start clean.
+            self._db.execute("DELETE FROM chunks")
+            self._db.execute("DELETE FROM documents")
+            self._db.commit()
+            return
+
+        self.index = faiss.read_index(self._index_path)
+        if isinstance(self.index, faiss.IndexIVF):
+            self.index.nprobe = self.ANN_NPROBE
+        names = dict(self._db.execute("SELECT doc_hash, document_name FROM documents"))
+        for doc_hash, name in names.items():
+            self.documents[doc_hash] = {"document_name": name, "ids": []}
+        for chunk_id, doc_hash, chunk_text in self._db.execute("SELECT id, doc_hash, chunk_text FROM chunks ORDER BY id"):
+            self.stored_chunks[chunk_id] = {"document_name": names[doc_hash], "chunk_text": chunk_text}
+            self.documents[doc_hash]["ids"].append(chunk_id)
+        self.next_id = max(self.stored_chunks, default=-1) + 1
+
+    def _save_document(self, doc_hash: str, doc_name: str, ids: List[int], chunks: List[str]):
+        if not self._db:
+            return
+        self._write_index()
+        self._db.execute("INSERT OR REPLACE INTO documents (doc_hash, document_name) VALUES (?, ?)", (doc_hash, doc_name))
+        self._db.executemany("INSERT OR REPLACE INTO chunks (id, doc_hash, chunk_text) VALUES (?, ?, ?)", [(chunk_id, doc_hash, chunk) for chunk_id, chunk in zip(ids, chunks)])
+        self._db.commit()
+
+    def _write_index(self):
+        tmp_path = self._index_path + ".tmp"
+        faiss.write_index(self.index, tmp_path)
+        os.replace(tmp_path, self._index_path)
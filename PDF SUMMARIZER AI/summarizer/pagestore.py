@@ -0,0 +1,215 @@
+# PDF SUMMARIZER AI/summarizer/pagestore.py
+
+import contextlib
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import numpy as np
+from typing import Iterator, Optional
+
+# File layout (little-endian):
+#   header   magic, format version, page count, paragraph count, text bytes (padded to 8 bytes)
+#   text     every page's UTF-8 text, concatenated (padded to 8 bytes)
+#   offsets  uint64[pages + 1]       byte offset of each page's text; the last entry is the end of the text
+#   numbers  uint32[pages]           1-based page numbers (empty pages are not stored)
+#   ranges   uint32[pages + 1]       index of each page's first paragraph token count
+#   tokens   uint32[paragraphs]      token count of every paragraph, in the order the chunker splits them
+MAGIC = b"PDFPAGES"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sIIIQ")
+_HEADER_SIZE = 32
+
+def _padded(size: int) -> int:
+    return -(-size // 8) * 8
+
+_digests: dict[tuple[str, int, int], str] = {}  # (path, size, mtime) -> sha256, to hash each file once
+_digests_lock = threading.Lock()
+
+def file_digest(pdf_path: str) -> str:
+    """SHA-256 of a file's content, remembered per path, size and mtime. Raises OSError if the file cannot be read."""
+    stat = os.stat(pdf_path)
+    key = (os.path.abspath(pdf_path), stat.st_size, stat.st_mtime_ns)
+    with _digests_lock:
+        cached = _digests.get(key)
+    if cached is not None:
+        return cached
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    with _digests_lock:
+        _digests[key] = digest.hexdigest()
+    return _digests[key]
+
+class StoredPages:
+    """A memory-mapped page file. Iterating it decodes each page straight from the mapping; close() unmaps it."""
+
+    def __init__(self, f, mapping: mmap.mmap, page_count: int, paragraph_count: int, text_bytes: int):
+        self._file = f
+        self._mapping = mapping
+        position = _padded(_HEADER_SIZE + text_bytes)
+        arrays = {}
+        for name, dtype, count in (("offsets", np.uint64, page_count + 1), ("numbers", np.uint32, page_count),
+                                   ("ranges", np.uint32, page_count + 1), ("tokens", np.uint32, paragraph_count)):
+            arrays[name] = np.frombuffer(mapping, dtype=dtype, count=count, offset=position).tolist()
+            position += count * np.dtype(dtype).itemsize
+        self.offsets, self.numbers, self.ranges, self.tokens = arrays["offsets"], arrays["numbers"], arrays["ranges"], arrays["tokens"]
+        if position > len(mapping) or self.offsets[-1] != text_bytes or self.ranges[-1] != paragraph_count:
+            raise ValueError("inconsistent page file")
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    def __iter__(self) -> Iterator[dict]:
+        with memoryview(self._mapping) as view:
+            for i, number in enumerate(self.numbers):
+                text = str(view[_HEADER_SIZE + self.offsets[i]:_HEADER_SIZE + self.offsets[i + 1]], "utf-8")
+                yield {"page": number, "text": text, "paragraph_tokens": self.tokens[self.ranges[i]:self.ranges[i + 1]]}
+
+    def close(self):
+        self._mapping.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+class PageWriter:
+    """
+    Streams pages into a temporary file next to the store and moves it into place on commit(),
+    so an interrupted extraction never leaves a partial page file behind. Only the small arrays are held in memory.
+    """
+
+    def __init__(self, path: str, on_commit=None):
+        self.path = path
+        self._on_commit = on_commit
+        self._fd, self._temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        self._file = os.fdopen(self._fd, "wb")
+        self._file.write(b"\0" * _HEADER_SIZE)
+        self._offsets = [0]
+        self._numbers = []
+        self._ranges = [0]
+        self._tokens = []
+
+    def add(self, page_number: int, text: str, paragraph_tokens: list[int]):
+        data = text.encode("utf-8")
+        self._file.write(data)
+        self._offsets.append(self._offsets[-1] + len(data))
+        self._numbers.append(page_number)
+        self._tokens.extend(paragraph_tokens)
+        self._ranges.append(len(self._tokens))
+
+    def commit(self):
+        text_bytes = self._offsets[-1]
+        self._file.write(b"\0" * (_padded(_HEADER_SIZE + text_bytes) - _HEADER_SIZE - text_bytes))
+        for values, dtype in ((self._offsets, np.uint64), (self._numbers, np.uint32), (self._ranges, np.uint32), (self._tokens, np.uint32)):
+            self._file.write(np.asarray(values, dtype=dtype).tobytes())
+        self._file.seek(0)
+        self._file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(self._numbers), len(self._tokens), text_bytes))
+        self._file.close()
+        os.replace(self._temp_path, self.path)
+        self._temp_path = None
+        if self._on_commit:
+            self._on_commit()
+
+    def close(self):
+        """Discards the pages unless they were committed."""
+        temp_path, self._temp_path = self._temp_path, None
+        if temp_path:
+            try:
+                self._file.close()  # may fail again after a failed write (e.g. a full disk); the file goes regardless
+            finally:
+                with contextlib.suppress(OSError):
+                    os.remove(temp_path)
+
+class PageStore:
+    """
+    Persistent cache of extracted page text and per-paragraph token counts, one binary file per document,
+    keyed by the PDF's content hash and the extractor version. Files are memory-mapped when reused, so repeat runs
+    skip PyMuPDF and the tokenizer entirely. Least recently used files are evicted beyond `max_bytes`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.directory = None
+        self.max_bytes = 0
+
+    def configure(self, directory: Optional[str], max_bytes: int = 512 * 1024 * 1024):
+        """Points the store at `directory`; None (or an empty string) disables it."""
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.directory = directory or None
+        self.max_bytes = max_bytes
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def path_for(self, pdf_path: str, extractor_version: int) -> Optional[str]:
+        """The page file for `pdf_path`, or None if the store is disabled or the PDF cannot be read."""
+        if not self.enabled:
+            return None
+        try:
+            digest = file_digest(pdf_path)
+        except OSError:
+            return None
+        return os.path.join(self.directory, f"{digest}-v{extractor_version}.pages")
+
+    def open(self, path: str) -> Optional[StoredPages]:
+        """Maps a page file; None if it does not exist or is not a valid page file (it is then rewritten on the next miss)."""
+        try:
+            f = open(path, "rb")
+        except OSError:
+            return None
+        mapping = None
+        try:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, page_count, paragraph_count, text_bytes = _HEADER.unpack_from(mapping)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError("not a page file")
+            stored = StoredPages(f, mapping, page_count, paragraph_count, text_bytes)
+        except (OSError, ValueError, struct.error):
+            if mapping is not None:
+                mapping.close()
+            f.close()
+            return None
+        # Marks the file as recently used for eviction; a read-only store or a concurrently evicted file is still readable.
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return stored
+
+    def writer(self, path: str) -> PageWriter:
+        return PageWriter(path, on_commit=self._evict)
+
+    def _evict(self):
+        """Deletes the least recently used page files until the store fits in `max_bytes`."""
+        if not self.max_bytes:
+            return
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.directory):
+                if name.endswith(".pages"):
+                    path = os.path.join(self.directory, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+# Shared by the whole process; configure_services() points it at config.PAGE_STORE_DIR.
+page_store = PageStore()
@@ -1,13 +1,36 @@
 # PDF SUMMARIZER AI/summarizer/parser.py
 
+from functools import lru_cache
 import tiktoken
 
-def count_tokens(text: str, model_name: str = "llama-3.3-70b-versatile") -> int:
+@lru_cache(maxsize=None)
+def get_encoding(model_name: str) -> tiktoken.Encoding:
     """
-    Counts the number of tokens in a string using the specified model's encoding.
+    Resolves the tiktoken encoding for a model once, falling back to cl100k_base for unknown models.
     """
     try:
-        encoding = tiktoken.encoding_for_model(model_name)
+        return tiktoken.encoding_for_model(model_name)
     except KeyError:
-        encoding = tiktoken.get_encoding("cl100k_base")
-    return len(encoding.encode(text))
\ No newline at end of file
+        return tiktoken.get_encoding("cl100k_base")
+
+def count_tokens(text: str, model_name: str = "llama-3.3-70b-versatile") -> int:
+    """
+    Counts the number of tokens in a string using the specified model's encoding.
+    """
+    return len(get_encoding(model_name).encode_ordinary(text))
+
+def count_tokens_many(texts: list[str], model_name: str = "llama-3.3-70b-versatile") -> list[int]:
+    """
+    Counts the tokens of many strings in one batched call.
+    """
+    if not texts:
+        return []
+    return [len(tokens) for tokens in get_encoding(model_name).encode_ordinary_batch(texts)]
+
+def split_by_tokens(text: str, max_tokens: int, model_name: str = "llama-3.3-70b-versatile") -> list[str]:
+    """
+    Cuts a string into consecutive pieces of at most `max_tokens` tokens each.
+    """
+    encoding = get_encoding(model_name)
+    tokens = encoding.encode_ordinary(text)
+    return [encoding.decode(tokens[start:start + max_tokens]) for start in range(0, len(tokens), max_tokens)]
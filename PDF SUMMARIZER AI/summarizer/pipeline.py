@@ -0,0 +1,157 @@
+# PDF SUMMARIZER AI/summarizer/pipeline.py
+
+import itertools
+import json
+import os
+from typing import Callable, Iterable, Optional
+from openai import OpenAI
+import config
+from summarizer.cache import response_cache
+from summarizer.cleaner import PageCleaner
+from summarizer.extractor import iter_pages, iter_chunks, extract_many
+from summarizer.generator import process_chunks, synthesize_chunks, final_synthesis_task, tree_summarize, compare_documents, compile_prompts, chunk_token_budget, is_error_response, failed_chunks_response
+from summarizer.pagestore import page_store
+from summarizer.ratelimit import rate_limiter
+from summarizer.salience import SalienceFilter
+from summarizer.tracing import tracer
+
+def configure_services():
+    """Applies config to the process-wide rate limiter, response cache, page store and tracer."""
+    rate_limiter.configure(config.RATE_LIMIT_RPM, config.RATE_LIMIT_TPM)
+    response_cache.configure(os.path.join(config.CACHE_DIR, "responses.sqlite3"), config.CACHE_MAX_MB * 1024 * 1024, config.CACHE_MAX_AGE_DAYS, bypass=config.CACHE_BYPASS)
+    page_store.configure(config.PAGE_STORE_DIR, config.PAGE_STORE_MAX_MB * 1024 * 1024)
+    tracer.configure(config.TRACING_ENABLED, config.TRACE_EXPORT_PATH, config.MODEL_PRICES)
+
+def create_client(base_url: Optional[str] = None, api_key: Optional[str] = None) -> OpenAI:
+    """
+    The OpenAI-compatible client every entry point uses. The SDK's own retries are turned off: they would resend
+    requests the rate limiter never paces, so retries go through _request_with_retry and its backoff instead.
+    """
+    return OpenAI(api_key=api_key or config.API_KEY, base_url=base_url or config.BASE_URL, max_retries=0)
+
+def load_prompts(path: str = "prompts.json") -> dict:
+    """Loads prompts.json and compiles its protocols into templates once."""
+    with open(path, "r", encoding="utf-8") as f:
+        return compile_prompts(json.load(f), config.MODEL_NAME)
+
+def chunk_token_limit(prompts_data: dict, task: str) -> int:
+    """Chunk size for `task`: the model's context window less the compiled prompt and the reserved output tokens."""
+    return chunk_token_budget(prompts_data, task, config.MODEL_CONTEXT_WINDOW)
+
+def preprocessing_signature() -> str:
+    """Describes the page preprocessing in effect; it changes chunk contents, so resumable work is keyed by it."""
+    parts = []
+    if config.CLEAN_PAGES:
+        parts.append("clean")
+    if config.SALIENCE_FILTER:
+        parts.append(f"salience{config.SALIENCE_KEEP_RATIO}-{config.SALIENCE_TOKEN_BUDGET}")
+    return "+".join(parts)
+
+def _noop(message: str):
+    pass
+
+def summarize_pages(client, prompts_data: dict, task: str, pages: Iterable[dict], word_count: int, progress: Callable[[str], None] = _noop,
+                    completed: Optional[dict[int, str]] = None, on_chunk_done: Optional[Callable[[int, str], None]] = None, stream=None,
+                    require_all_chunks: bool = False) -> str:
+    """
+    Runs the LLM stages of a single-document task ('summarize' or 'research_summary') over extracted pages.
+    `pages` may be a lazy stream. `completed` and `on_chunk_done` let callers resume the chunk stage; see process_chunks.
+    With `require_all_chunks`, a failed chunk skips the merge/synthesis calls and an error placeholder is returned,
+    so callers that will rerun the document anyway do not pay for them.
+    `stream` receives the research summary's final synthesis as it is generated; see stream_request_with_retry.
+    With config.CLEAN_PAGES, repeated headers/footers and duplicate paragraphs are removed before chunking.
+    With config.SALIENCE_FILTER, only the most salient paragraphs are sent on; the document is then buffered before the map stage.
+    """
+    chunk_limit = chunk_token_limit(prompts_data, task)
+    cleaner = PageCleaner(model_name=config.MODEL_NAME) if config.CLEAN_PAGES else None
+    if cleaner:
+        pages = tracer.iter_span("cleaning", cleaner.clean(pages))
+    if config.SALIENCE_FILTER:
+        pages = list(pages)
+        salience = SalienceFilter(config.SALIENCE_KEEP_RATIO, config.SALIENCE_TOKEN_BUDGET, min_tokens=chunk_limit, model_name=config.MODEL_NAME)
+        with tracer.span("salience"):
+            pages = salience.filter(pages)
+        progress(salience.report())
+    chunks = tracer.iter_span("chunking", iter_chunks(pages, token_limit=chunk_limit))
+
+    if task == 'research_summary':
+        progress("🧠 [Step 2/2] Analyzing chunks as pages are extracted and writing final summary...")
+        with tracer.span("map"):
+            processed_chunks = process_chunks(client, config.MAP_MODEL_NAME, prompts_data, config.MAX_RETRIES, config.RETRY_DELAY, chunks, task, word_count,
+                                              max_workers=config.MAX_CONCURRENT_REQUESTS, completed=completed, on_chunk_done=on_chunk_done,
+                                              escalation_model=config.REDUCE_MODEL_NAME)
+        if cleaner:
+            progress(cleaner.report())
+        failed = sum(is_error_response(result) for result in processed_chunks)
+        if require_all_chunks and failed:
+            return failed_chunks_response(failed)
+        structured_data_json = synthesize_chunks(processed_chunks, task)
+        return final_synthesis_task(client, config.REDUCE_MODEL_NAME, prompts_data, config.MAX_RETRIES, config.RETRY_DELAY, structured_data_json, word_count, stream=stream)
+
+    # Handles the standard "summarize" task
+    progress("🧠 [Step 2/2] Summarizing chunks as pages are extracted and consolidating them...")
+    summary = tree_summarize(client, config.MAP_MODEL_NAME, prompts_data, config.MAX_RETRIES, config.RETRY_DELAY, chunks, task, "summarize_merge", word_count,
+                             fan_in=config.REDUCE_FAN_IN, token_budget=config.REDUCE_TOKEN_BUDGET, max_workers=config.MAX_CONCURRENT_REQUESTS,
+                             completed=completed, on_chunk_done=on_chunk_done, reduce_model_name=config.REDUCE_MODEL_NAME,
+                             require_all_chunks=require_all_chunks)
+    if cleaner:
+        progress(cleaner.report())
+    return summary
+
+def summarize_document(client, prompts_data: dict, task: str, pdf_path: str, word_count: int, progress: Callable[[str], None] = _noop,
+                       completed: Optional[dict[int, str]] = None, on_chunk_done: Optional[Callable[[int, str], None]] = None, stream=None,
+                       require_all_chunks: bool = False) -> str:
+    """
+    Extracts a PDF and runs a single-document task on it, returning the raw model output.
+    Chunks are dispatched to the LLM while later pages are still being extracted.
+    Raises ValueError if no text can be extracted.
+    """
+    doc_name = os.path.basename(pdf_path)
+    progress(f"📤 [Step 1/2] Extracting data from [cyan]{doc_name}[/cyan]...")
+    pages = tracer.iter_span("extraction", iter_pages(pdf_path, workers=config.EXTRACTION_WORKERS))
+    first_page = next(pages, None)
+    if first_page is None:
+        raise ValueError(f"Could not extract data from '{doc_name}'.")
+    return summarize_pages(client, prompts_data, task, itertools.chain([first_page], pages), word_count, progress, completed, on_chunk_done, stream,
+                           require_all_chunks)
+
+def extract_documents(pdf_paths: list[str], warn: Callable[[str], None] = print, progress: Callable[[str], None] = _noop) -> list[tuple[str, list[dict]]]:
+    """
+    Extracts several PDFs concurrently into (document_name, pages) pairs.
+    Unreadable documents are skipped with a warning; raises ValueError if fewer than two remain.
+    With config.CLEAN_PAGES, each document's repeated headers/footers and duplicate paragraphs are removed.
+    """
+    documents = []
+    for path, pages in zip(pdf_paths, extract_many(pdf_paths, workers=config.EXTRACTION_WORKERS)):
+        if pages and config.CLEAN_PAGES:
+            cleaner = PageCleaner(model_name=config.MODEL_NAME)
+            with tracer.span("cleaning"):
+                pages = list(cleaner.clean(pages))
+            progress(f"{os.path.basename(path)}: {cleaner.report()}")
+        if pages:
+            documents.append((os.path.basename(path), pages))
+        else:
+            warn(f"⚠️ Could not extract data from '{os.path.basename(path)}'; skipping it.")
+    if len(documents) < 2:
+        raise ValueError("At least two readable documents are needed for comparison.")
+    return documents
+
+def compare_extracted(client, prompts_data: dict, documents: list[tuple[str, list[dict]]], word_count: int, progress: Callable[[str], None] = _noop) -> str:
+    """Runs the multi-document comparison over extracted documents and returns the raw JSON output."""
+    progress(f"🧠 Condensing {len(documents)} documents and synthesizing comparative analysis...")
+    return compare_documents(client, config.MAP_MODEL_NAME, prompts_data, config.MAX_RETRIES, config.RETRY_DELAY, documents, word_count,
+                             token_budget=config.COMPARE_TOKEN_BUDGET, chunk_token_limit=chunk_token_limit(prompts_data, "document_digest"), fan_in=config.REDUCE_FAN_IN,
+                             max_workers=config.MAX_CONCURRENT_REQUESTS, reduce_model_name=config.REDUCE_MODEL_NAME)
+
+def compare_pdfs(client, prompts_data: dict, pdf_paths: list[str], word_count: int, progress: Callable[[str], None] = _noop,
+                 warn: Callable[[str], None] = print) -> str:
+    """Extracts and compares the given PDFs, returning the raw JSON output."""
+    progress(f"Extracting data from [cyan]{len(pdf_paths)}[/cyan] documents...")
+    return compare_extracted(client, prompts_data, extract_documents(pdf_paths, warn, progress), word_count, progress)
+
+def run_task(client, prompts_data: dict, task: str, pdf_paths: list[str], word_count: int, progress: Callable[[str], None] = _noop,
+             warn: Callable[[str], None] = print, stream=None) -> str:
+    """Dispatches to the multi-document or single-document pipeline."""
+    if task == "multi_doc_compare":
+        return compare_pdfs(client, prompts_data, pdf_paths, word_count, progress, warn)
+    return summarize_document(client, prompts_data, task, pdf_paths[0], word_count, progress, stream=stream)
@@ -0,0 +1,144 @@
+# PDF SUMMARIZER AI/summarizer/ratelimit.py
+
+import random
+import re
+import threading
+import time
+from typing import Optional
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+def parse_duration(value) -> Optional[float]:
+    """Parses a rate-limit header duration ('7.66s', '2m59.56s', '120ms' or plain seconds) into seconds."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+class TokenBucket:
+    """A bucket holding up to `capacity` units that refills evenly over `period` seconds."""
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.available = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Debits `amount` (possibly into deficit) and returns how long the caller must wait for it."""
+        self._refill(now)
+        self.available -= min(amount, self.capacity)
+        return 0.0 if self.available >= 0 else -self.available / self.rate
+
+    def adjust(self, delta: float, now: float):
+        """Credits (positive) or debits (negative) the bucket after the fact."""
+        self._refill(now)
+        self.available = min(self.capacity, self.available + delta)
+
+    def sync(self, remaining: float, now: float):
+        """Lowers the local budget to what the provider reports as remaining."""
+        self._refill(now)
+        self.available = min(self.available, float(remaining))
+
+class RateLimiter:
+    """
+    Pacing for LLM calls, budgeting both requests and tokens per minute.
+    The local budgets are corrected from the provider's x-ratelimit-* and retry-after headers.
+    Providers limit each model separately, so calls go through for_model(), which keeps one limiter per model name.
+    """
+
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        self._lock = threading.Lock()
+        self.blocked_until = 0.0
+        self._models: dict[str, "RateLimiter"] = {}
+        self.configure(requests_per_minute, tokens_per_minute)
+
+    def configure(self, requests_per_minute: int, tokens_per_minute: int):
+        """Sets the per-minute budgets, for this limiter and every per-model one. A value of 0 disables that budget."""
+        with self._lock:
+            self.requests_per_minute = requests_per_minute
+            self.tokens_per_minute = tokens_per_minute
+            self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+            self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+            self._models.clear()
+
+    def for_model(self, model_name: str) -> "RateLimiter":
+        """The limiter for `model_name`, created with this limiter's budgets on first use."""
+        with self._lock:
+            limiter = self._models.get(model_name)
+            if limiter is None:
+                limiter = self._models[model_name] = RateLimiter(self.requests_per_minute, self.tokens_per_minute)
+            return limiter
+
+    def acquire(self, tokens: int = 0) -> float:
+        """Blocks until one request of roughly `tokens` prompt tokens fits the budget. Returns the time waited."""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(self.blocked_until - now, 0.0)
+            if self.requests:
+                wait = max(wait, self.requests.reserve(1, now))
+            if self.tokens and tokens:
+                wait = max(wait, self.tokens.reserve(tokens, now))
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int):
+        """Reconciles the token budget with the usage the API actually reported."""
+        if not self.tokens or actual_tokens is None:
+            return
+        with self._lock:
+            self.tokens.adjust(estimated_tokens - actual_tokens, time.monotonic())
+
+    def pause(self, seconds: float):
+        """Holds back every caller of this limiter for `seconds`, e.g. when the provider sends retry-after."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers):
+        """Adjusts the local pace from the provider's rate-limit response headers."""
+        if not headers:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+                remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+                if remaining is None:
+                    continue
+                try:
+                    remaining = float(remaining)
+                except ValueError:
+                    continue
+                if bucket:
+                    bucket.sync(remaining, now)
+                if remaining <= 0:
+                    reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                    if reset:
+                        self.blocked_until = max(self.blocked_until, now + reset)
+
+    def backoff_delay(self, attempt: int, base_delay: float, headers=None, max_delay: float = 60.0) -> float:
+        """
+        Returns a full-jitter exponential backoff delay for the given attempt.
+        A retry-after header takes precedence and pauses all callers of this limiter, not just this one.
+        """
+        delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+        retry_after = parse_duration(headers.get("retry-after")) if headers else None
+        if retry_after:
+            self.pause(retry_after)
+            delay = max(delay, retry_after)
+        return delay
+
+# Shared by every LLM call in the process; configure_services() sets the budgets from config.
+rate_limiter = RateLimiter()
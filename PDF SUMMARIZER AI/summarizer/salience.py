@@ -0,0 +1,117 @@
+# PDF SUMMARIZER AI/summarizer/salience.py
+
+import re
+import numpy as np
+from typing import Iterable
+from summarizer.extractor import split_paragraphs, split_sentences, with_text
+from summarizer.parser import count_tokens_many
+
+_TERMS = re.compile(r"[a-z][a-z0-9\-]{2,}")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?\s*(?:%|db|hz|khz|ms|s\b|x\b)?", re.IGNORECASE)
+
+STOPWORDS = frozenset("""
+the and for are but not you all any can had her was one our out day get has him his how man new now old see two way who
+boy did its let put say she too use that with have this will your from they know want been good much some time very when
+come here just like long make many more only over such take than them well were what also into most other their there these
+which would about after again being could does each where while should those through between during because before under
+""".split())
+
+class SalienceFilter:
+    """
+    Extractive pre-filter run before the map stage. Each passage (a paragraph, or a run of sentences of a long one)
+    is scored by the cosine similarity of its TF-IDF vector to the document centroid, boosted for passages carrying
+    numbers, which hold the quantitative evidence. The best-scoring passages are kept up to a token budget, in document
+    order and on their original pages, so page labels and source_page citations are unchanged.
+    The whole document is scored at once, so this stage buffers the pages it receives.
+    """
+
+    def __init__(self, keep_ratio: float = 0.5, token_budget: int = 0, number_boost: float = 0.25, min_tokens: int = 0,
+                 max_unit_words: int = 120, model_name: str = "llama-3.3-70b-versatile"):
+        self.keep_ratio = keep_ratio
+        self.token_budget = token_budget
+        self.number_boost = number_boost
+        self.min_tokens = min_tokens
+        self.max_unit_words = max_unit_words
+        self.model_name = model_name
+        self.tokens_before = 0
+        self.tokens_kept = 0
+        self.paragraphs_before = 0
+        self.paragraphs_kept = 0
+
+    def score(self, paragraphs: list[str]) -> np.ndarray:
+        """Centroid-similarity scores for the passages, computed on a sparse (row, term, weight) layout."""
+        vocabulary: dict[str, int] = {}
+        rows, cols = [], []
+        for row, paragraph in enumerate(paragraphs):
+            for term in _TERMS.findall(paragraph.lower()):
+                if term not in STOPWORDS:
+                    rows.append(row)
+                    cols.append(vocabulary.setdefault(term, len(vocabulary)))
+        n = len(paragraphs)
+        scores = np.zeros(n)
+        if vocabulary:
+            pairs, tf = np.unique(np.asarray(rows, dtype=np.int64) * len(vocabulary) + np.asarray(cols, dtype=np.int64), return_counts=True)
+            rows, cols = pairs // len(vocabulary), pairs % len(vocabulary)
+            idf = np.log((1 + n) / (1 + np.bincount(cols, minlength=len(vocabulary)))) + 1
+            weights = (1 + np.log(tf)) * idf[cols]
+            weights /= np.sqrt(np.bincount(rows, weights ** 2, minlength=n))[rows]
+            centroid = np.bincount(cols, weights, minlength=len(vocabulary)) / n
+            scores = np.bincount(rows, weights * centroid[cols], minlength=n) / (np.linalg.norm(centroid) or 1.0)
+        has_numbers = np.fromiter((bool(_NUMBER.search(paragraph)) for paragraph in paragraphs), dtype=bool, count=n)
+        return scores * (1 + self.number_boost * has_numbers)
+
+    def _units(self, paragraph: str) -> list[str]:
+        """Splits a long paragraph (often a whole page of PDF text) into runs of sentences of about `max_unit_words` words."""
+        if len(paragraph.split()) <= self.max_unit_words:
+            return [paragraph]
+        units, current, words = [], [], 0
+        for sentence in split_sentences(paragraph):
+            current.append(sentence)
+            words += len(sentence.split())
+            if words >= self.max_unit_words:
+                units.append(" ".join(current))
+                current, words = [], 0
+        if current:
+            units.append(" ".join(current))
+        return units
+
+    def filter(self, pages: Iterable[dict]) -> list[dict]:
+        """Returns the pages with only their most salient text; pages left with none are dropped."""
+        pages = list(pages)
+        units = [
+            (page_index, para_index, unit)
+            for page_index, page in enumerate(pages)
+            for para_index, para in enumerate(split_paragraphs(page["text"])) if para.strip()
+            for unit in self._units(para)
+        ]
+        token_counts = np.asarray(count_tokens_many([unit for _, _, unit in units], self.model_name), dtype=np.int64)
+        total = int(token_counts.sum())
+        self.tokens_before += total
+        self.paragraphs_before += len(units)
+
+        budget = int(total * self.keep_ratio)
+        if self.token_budget:
+            budget = min(budget, self.token_budget)
+        if total <= max(budget, self.min_tokens):
+            self.tokens_kept += total
+            self.paragraphs_kept += len(units)
+            return pages
+
+        order = np.argsort(-self.score([unit for _, _, unit in units]), kind="stable")
+        cumulative = np.cumsum(token_counts[order])
+        keep = np.zeros(len(units), dtype=bool)
+        keep[order[cumulative <= budget]] = True
+        if not keep.any():
+            keep[order[0]] = True
+        self.tokens_kept += int(token_counts[keep].sum())
+        self.paragraphs_kept += int(keep.sum())
+
+        kept_by_page: dict[int, dict[int, list[str]]] = {}
+        for (page_index, para_index, unit), kept in zip(units, keep):
+            if kept:
+                kept_by_page.setdefault(page_index, {}).setdefault(para_index, []).append(unit)
+        return [with_text(pages[page_index], "\n\n".join(" ".join(para) for para in paras.values())) for page_index, paras in kept_by_page.items()]
+
+    def report(self) -> str:
+        return (f"🎯 Salience filter kept {self.paragraphs_kept} of {self.paragraphs_before} passage(s), "
+                f"{self.tokens_kept:,} of {self.tokens_before:,} tokens.")
@@ -0,0 +1,220 @@
+# PDF SUMMARIZER AI/summarizer/structured.py
+
+import json
+import re
+from typing import Optional
+
+_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.IGNORECASE)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_WORDS = re.compile(r"\w+")
+_CONFIDENCE_RANK = {"low": 0, "medium": 1, "high": 2}
+MAX_REPAIR_CUTS = 8
+
+def _close_truncated(text: str) -> Optional[str]:
+    """
+    Closes a JSON object that was cut off mid-generation: finishes an open string, then drops the incomplete
+    trailing member (backing off one comma at a time) and appends the missing closing brackets.
+    """
+    stack, cuts = [], []  # cuts: (position of a separating comma, brackets open there)
+    in_string = escaped = False
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            if not stack:
+                return None
+            stack.pop()
+        elif char == ",":
+            cuts.append((i, list(stack)))
+    if not stack and not in_string:
+        return None  # not truncated; nothing to close
+
+    candidates = [text + ('"' if in_string else "") + "".join(reversed(stack))]
+    candidates += [text[:position] + "".join(reversed(open_brackets)) for position, open_brackets in reversed(cuts[-MAX_REPAIR_CUTS:])]
+    for candidate in candidates:
+        try:
+            json.loads(candidate)
+            return candidate
+        except json.JSONDecodeError:
+            continue
+    return None
+
+def repair_json(text: str) -> Optional[dict]:
+    """
+    Parses a model's JSON object reply, repairing the usual defects locally: code fences, prose around the object,
+    trailing commas and truncated output. Returns None if no object can be recovered.
+    """
+    if not text:
+        return None
+    try:
+        data = json.loads(text)
+        return data if isinstance(data, dict) else None
+    except json.JSONDecodeError:
+        pass
+    body = _FENCE.sub("", text.strip())
+    start = body.find("{")
+    if start < 0:
+        return None
+    body = body[start:]
+    end = body.rfind("}")
+    attempts = [body[:end + 1]] if end >= 0 else []
+    attempts.append(body)
+    for attempt in attempts:
+        attempt = _TRAILING_COMMA.sub(r"\1", attempt)
+        for candidate in (attempt, _close_truncated(attempt)):
+            if candidate is None:
+                continue
+            try:
+                data = json.loads(candidate)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(data, dict):
+                return data
+    return None
+
+def _empty_like(template):
+    if isinstance(template, list):
+        return []
+    if isinstance(template, dict):
+        return {}
+    return ""
+
+def conform(data: dict, structure: dict) -> list[str]:
+    """
+    Checks a parsed reply against a protocol's `structure` and fixes what can be fixed in place:
+    missing fields are added empty and a lone object where a list belongs is wrapped in a list.
+    Returns the problems that could not be fixed (an empty list means the reply is usable).
+    """
+    problems = []
+    if set(data) == {"error"}:
+        return ["error placeholder"]
+    for key, template in structure.items():
+        if key not in data or data[key] is None:
+            data[key] = _empty_like(template)
+            continue
+        value = data[key]
+        if isinstance(template, list):
+            if isinstance(value, dict):
+                data[key] = value = [value]
+            if not isinstance(value, list):
+                problems.append(f"'{key}' should be a list")
+                continue
+            if template and isinstance(template[0], dict):
+                data[key] = [item for item in value if isinstance(item, dict)]
+                if value and not data[key]:
+                    problems.append(f"'{key}' items should be objects")
+        elif isinstance(template, str) and not isinstance(value, str):
+            if isinstance(value, (dict, list)):
+                problems.append(f"'{key}' should be text")
+            else:
+                data[key] = str(value)
+    if not any(data.get(key) for key in structure):
+        problems.append("no content in any expected field")
+    return problems
+
+def parse_structured(text: str, structure: dict) -> Optional[dict]:
+    """Repairs and validates a reply against `structure`; None if it is unusable and should be re-requested."""
+    data = repair_json(text)
+    if data is None or conform(data, structure):
+        return None
+    return data
+
+def _page_numbers(label) -> set[int]:
+    pages = set()
+    for start, end in re.findall(r"(\d+)\s*(?:-\s*(\d+))?", str(label or "")):
+        first, last = int(start), int(end or start)
+        if last - first <= 10_000:
+            pages.update(range(first, last + 1))
+    return pages
+
+def merge_source_pages(*labels) -> str:
+    """Unions page labels such as '3', '4-6' and '9' into compact ranges: '3-6, 9'."""
+    pages = sorted(set().union(*(_page_numbers(label) for label in labels)))
+    ranges = []
+    for page in pages:
+        if ranges and page == ranges[-1][1] + 1:
+            ranges[-1][1] = page
+        else:
+            ranges.append([page, page])
+    merged = ", ".join(str(first) if first == last else f"{first}-{last}" for first, last in ranges)
+    return merged or next((str(label) for label in labels if label), "")
+
+# Fields whose wording identifies a list item; items are only compared within the same document.
+IDENTITY_FIELDS = ("finding", "insight")
+
+def _signature(value) -> tuple[str, frozenset]:
+    """(scope, words) used to spot repeated items. Numbers count as words, so results that differ in value stay apart."""
+    scope = ""
+    if isinstance(value, dict):
+        scope = str(value.get("document_name", ""))
+        value = next((value[field] for field in IDENTITY_FIELDS if value.get(field)),
+                     " ".join(text for text in value.values() if isinstance(text, str)))
+    return scope, frozenset(word for word in _WORDS.findall(str(value).lower()) if len(word) > 2 or word.isdigit())
+
+class StructuredMerger:
+    """
+    Incrementally merges per-chunk JSON objects. The first non-empty value of each text field is kept; list fields are
+    concatenated, except that an item whose wording overlaps an earlier one by at least `similarity` (Jaccard over
+    words) is folded into it: their source pages are unioned and the higher-confidence, more detailed fields are kept.
+    """
+
+    def __init__(self, similarity: float = 0.75):
+        self.similarity = similarity
+        self.result: dict = {}
+        self.merged = 0
+        self.duplicates = 0
+        self._signatures: dict[str, list[tuple[str, frozenset]]] = {}
+        self._index: dict[str, dict[str, set[int]]] = {}  # field -> word -> item positions
+
+    def add(self, data: dict):
+        for key, value in data.items():
+            if isinstance(value, list):
+                items = self.result.setdefault(key, [])
+                if not isinstance(items, list):
+                    continue
+                for item in value:
+                    self._add_item(key, items, item)
+            elif key not in self.result or not self.result[key]:
+                self.result[key] = value
+        self.merged += 1
+
+    def _add_item(self, key: str, items: list, item):
+        scope, signature = _signature(item)
+        signatures = self._signatures.setdefault(key, [])
+        index = self._index.setdefault(key, {})
+        candidates = set().union(*(index.get(word, set()) for word in signature)) if signature else set()
+        for position in sorted(candidates):
+            other_scope, other = signatures[position]
+            if other_scope == scope and len(signature & other) / len(signature | other) >= self.similarity:
+                items[position] = self._combine(items[position], item)
+                self.duplicates += 1
+                return
+        position = len(items)
+        items.append(item)
+        signatures.append((scope, signature))
+        for word in signature:
+            index.setdefault(word, set()).add(position)
+
+    @staticmethod
+    def _combine(kept, new):
+        if not (isinstance(kept, dict) and isinstance(new, dict)):
+            return kept
+        combined = dict(kept)
+        for field, value in new.items():
+            if field == "source_page":
+                combined[field] = merge_source_pages(kept.get(field), value)
+            elif field == "confidence":
+                if _CONFIDENCE_RANK.get(str(value).lower(), -1) > _CONFIDENCE_RANK.get(str(kept.get(field)).lower(), -1):
+                    combined[field] = value
+            elif isinstance(value, str) and len(value) > len(str(kept.get(field) or "")):
+                combined[field] = value
+        return combined
@@ -0,0 +1,249 @@
+# PDF SUMMARIZER AI/summarizer/tracing.py
+
+import contextvars
+import functools
+import json
+import os
+import re
+import threading
+import time
+from typing import Iterable, Iterator, Optional
+
+# Name of the innermost open span; LLM calls are attributed to it as their stage.
+# ordered_map copies the context into worker threads, so calls made there keep the caller's stage.
+_current_stage = contextvars.ContextVar("trace_stage", default="run")
+
+class Span:
+    """One timed operation. Numeric attributes are summed per (span, stage) in the run summary."""
+
+    __slots__ = ("tracer", "name", "stage", "attrs", "start", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: dict):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def add(self, **amounts):
+        for key, amount in amounts.items():
+            self.attrs[key] = self.attrs.get(key, 0) + amount
+
+    def __enter__(self):
+        self.stage = _current_stage.get()
+        self._token = _current_stage.set(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        _current_stage.reset(self._token)
+        if exc_type:
+            self.attrs.setdefault("error", exc_type.__name__)
+        self.tracer.record(self.name, self.stage, duration, self.attrs)
+        return False
+
+class _NullSpan:
+    """Stand-in returned while tracing is disabled, so instrumented code pays only an attribute check."""
+
+    def set(self, **attrs):
+        pass
+
+    def add(self, **amounts):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+NULL_SPAN = _NullSpan()
+
+class Tracer:
+    """
+    Process-wide, opt-in span recorder. Spans are aggregated per (name, stage) for the run summary and,
+    with an export path, written as JSONL events ('.jsonl') or as a Prometheus text snapshot ('.prom').
+    While disabled, span() returns a shared no-op and traced()/iter_span() pass calls straight through.
+    """
+
+    FLUSH_EVERY = 256  # buffered JSONL events between writes
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.enabled = False
+        self.export_path = None
+        self.prices: dict[str, tuple[float, float]] = {}
+        self._events = []
+        self.reset()
+
+    def configure(self, enabled: bool, export_path: Optional[str] = None, prices: Optional[dict] = None):
+        """`prices` maps model names to USD per million (input, output) tokens, for cost accounting."""
+        self.flush()
+        self.enabled = enabled
+        self.export_path = export_path or None
+        self.prices = dict(prices or {})
+
+    def cost(self, model_name: str, prompt_tokens: int, completion_tokens: int) -> float:
+        """USD cost of one call; 0 for models without a configured price."""
+        input_price, output_price = self.prices.get(model_name, (0.0, 0.0))
+        return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+    def reset(self):
+        """Clears the aggregates, e.g. between runs of an interactive session."""
+        with self._lock:
+            self.aggregates: dict[tuple[str, str], dict] = {}
+            self.models: dict[str, dict] = {}  # LLM call totals per model, across stages
+
+    def span(self, name: str, **attrs):
+        """Context manager timing a block; nested spans and LLM calls inside it report `name` as their stage."""
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, attrs)
+
+    def traced(self, name: str):
+        """Decorator form of span(). A call made directly inside a span of the same name is not recorded twice."""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled or _current_stage.get() == name:
+                    return fn(*args, **kwargs)
+                with Span(self, name, {}):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def iter_span(self, name: str, iterable: Iterable) -> Iterable:
+        """
+        Times the work done producing each item of a lazy stream, recorded as one span when the stream ends.
+        Time spent in nested iter_spans (e.g. extraction feeding chunking) is excluded, so stages add up.
+        """
+        if not self.enabled:
+            return iterable
+        return self._iter_span(name, iterable)
+
+    def _iter_span(self, name: str, iterable: Iterable) -> Iterator:
+        stack = self._local.__dict__.setdefault("stack", [])
+        stage = _current_stage.get()
+        iterator = iter(iterable)
+        own_seconds, items = 0.0, 0
+        try:
+            while True:
+                frame = [0.0]  # seconds spent in nested iter_spans during this step
+                stack.append(frame)
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    elapsed = time.perf_counter() - start
+                    stack.pop()
+                    own_seconds += elapsed - frame[0]
+                    if stack:
+                        stack[-1][0] += elapsed
+                items += 1
+                yield item
+        finally:
+            self.record(name, stage, own_seconds, {"items": items})
+
+    def record(self, name: str, stage: str, duration: float, attrs: dict):
+        with self._lock:
+            aggregate = self.aggregates.get((name, stage))
+            if aggregate is None:
+                aggregate = self.aggregates[(name, stage)] = {"count": 0, "seconds": 0.0, "max_seconds": 0.0, "totals": {}}
+            aggregate["count"] += 1
+            aggregate["seconds"] += duration
+            aggregate["max_seconds"] = max(aggregate["max_seconds"], duration)
+            numeric = {key: value for key, value in attrs.items() if isinstance(value, (int, float)) and not isinstance(value, bool)}
+            for key, value in numeric.items():
+                aggregate["totals"][key] = aggregate["totals"].get(key, 0) + value
+            if name == "llm_call" and attrs.get("model"):
+                model = self.models.setdefault(attrs["model"], {"count": 0, "seconds": 0.0, "totals": {}})
+                model["count"] += 1
+                model["seconds"] += duration
+                for key, value in numeric.items():
+                    model["totals"][key] = model["totals"].get(key, 0) + value
+            if self.export_path and self.export_path.endswith(".jsonl"):
+                self._events.append({"ts": time.time(), "span": name, "stage": stage, "seconds": round(duration, 6), **attrs})
+                if len(self._events) >= self.FLUSH_EVERY:
+                    self._write_events()
+
+    def _write_events(self):
+        os.makedirs(os.path.dirname(self.export_path) or ".", exist_ok=True)
+        with open(self.export_path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(event, ensure_ascii=False) + "\n" for event in self._events)
+        self._events = []
+
+    def flush(self):
+        """Writes buffered events (JSONL) or the current aggregates (Prometheus text) to the export path."""
+        if not self.export_path:
+            return
+        with self._lock:
+            if self.export_path.endswith(".jsonl"):
+                if self._events:
+                    self._write_events()
+                return
+        os.makedirs(os.path.dirname(self.export_path) or ".", exist_ok=True)
+        with open(self.export_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+
+    def snapshot(self) -> dict[tuple[str, str], dict]:
+        with self._lock:
+            return {key: {**value, "totals": dict(value["totals"])} for key, value in self.aggregates.items()}
+
+    def model_snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            return {key: {**value, "totals": dict(value["totals"])} for key, value in self.models.items()}
+
+    def prometheus_text(self) -> str:
+        """Renders the aggregates in the Prometheus text exposition format, one group of samples per metric."""
+        families = {"summarizer_span_count": ("counter", []), "summarizer_span_seconds_total": ("counter", []),
+                    "summarizer_span_seconds_max": ("gauge", [])}
+        for (name, stage), aggregate in sorted(self.snapshot().items()):
+            labels = f'{{span="{name}",stage="{stage}"}}'
+            families["summarizer_span_count"][1].append(f"{labels} {aggregate['count']}")
+            families["summarizer_span_seconds_total"][1].append(f"{labels} {aggregate['seconds']:.6f}")
+            families["summarizer_span_seconds_max"][1].append(f"{labels} {aggregate['max_seconds']:.6f}")
+            for key, value in sorted(aggregate["totals"].items()):
+                metric = "summarizer_" + re.sub(r"[^a-zA-Z0-9_]", "_", key) + "_total"
+                families.setdefault(metric, ("counter", []))[1].append(f"{labels} {value}")
+        lines = []
+        for metric, (kind, samples) in families.items():
+            lines.append(f"# TYPE {metric} {kind}")
+            lines.extend(metric + sample for sample in samples)
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """A plain-text table of where time, tokens and cache hits went during the run."""
+        aggregates = self.snapshot()
+        if not aggregates:
+            return "No spans recorded."
+        rows = [f"{'span':<16} {'stage':<16} {'calls':>6} {'total s':>9} {'max s':>8}"]
+        for (name, stage), aggregate in sorted(aggregates.items(), key=lambda item: -item[1]["seconds"]):
+            rows.append(f"{name:<16} {stage:<16} {aggregate['count']:>6} {aggregate['seconds']:>9.2f} {aggregate['max_seconds']:>8.2f}")
+
+        llm = {stage: aggregate for (name, stage), aggregate in aggregates.items() if name == "llm_call"}
+        if llm:
+            rows.append("")
+            rows.append(f"{'LLM stage':<16} {'calls':>6} {'cache hit':>9} {'queue s':>8} {'retries':>7} {'avg s':>7} {'prompt tok':>10} {'output tok':>10} {'cost $':>9}")
+            for stage, aggregate in sorted(llm.items()):
+                totals = aggregate["totals"]
+                rows.append(f"{stage:<16} {aggregate['count']:>6} {totals.get('cache_hit', 0) / aggregate['count']:>9.0%} "
+                            f"{totals.get('queue_wait', 0):>8.2f} {totals.get('retries', 0):>7} {aggregate['seconds'] / aggregate['count']:>7.2f} "
+                            f"{totals.get('prompt_tokens', 0):>10} {totals.get('completion_tokens', 0):>10} {totals.get('cost_usd', 0):>9.4f}")
+
+        models = self.model_snapshot()
+        if len(models) > 1:
+            rows.append("")
+            rows.append(f"{'LLM model':<32} {'calls':>6} {'avg s':>7} {'prompt tok':>10} {'output tok':>10} {'cost $':>9}")
+            for model, aggregate in sorted(models.items()):
+                totals = aggregate["totals"]
+                rows.append(f"{model:<32} {aggregate['count']:>6} {aggregate['seconds'] / aggregate['count']:>7.2f} "
+                            f"{totals.get('prompt_tokens', 0):>10} {totals.get('completion_tokens', 0):>10} {totals.get('cost_usd', 0):>9.4f}")
+        return "\n".join(rows)
+
+# Shared by the whole process; configure_services() enables it from config.
+tracer = Tracer()
@@ -0,0 +1,23 @@
+# PDF SUMMARIZER AI/tests/conftest.py
+
+import json
+import os
+import sys
+import tempfile
+import pytest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+# config reads these at import time: a dummy key, no pacing, and caches kept out of the working tree.
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+os.environ.setdefault("RATE_LIMIT_RPM", "0")
+os.environ.setdefault("RATE_LIMIT_TPM", "0")
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="summarizer-test-cache-"))
+os.environ.setdefault("PAGE_STORE_DIR", "")
+
+@pytest.fixture(scope="session")
+def prompts_data():
+    from summarizer.generator import compile_prompts
+    with open(os.path.join(PROJECT_DIR, "prompts.json"), "r", encoding="utf-8") as f:
+        return compile_prompts(json.load(f))
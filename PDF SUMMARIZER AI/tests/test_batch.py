@@ -0,0 +1,57 @@
+# PDF SUMMARIZER AI/tests/test_batch.py
+
+import json
+from batch import Manifest, document_key
+
+def test_manifest_replays_documents_and_chunks(tmp_path):
+    path = str(tmp_path / "runs" / "manifest.jsonl")
+    manifest = Manifest(path)
+    manifest.record("doc-a", status="running", pdf="a.pdf")
+    manifest.record_chunk("doc-a", 0, "first")
+    manifest.record_chunk("doc-a", 1, "second")
+    manifest.record_chunk("doc-a", 1, "second, retried")
+    manifest.record("doc-b", status="done", output="b.txt")
+    manifest.close()
+
+    replayed = Manifest(path)
+    replayed.close()
+    assert replayed.documents == manifest.documents
+    assert replayed.documents["doc-a"] == {"status": "running", "pdf": "a.pdf", "chunks": {0: "first", 1: "second, retried"}}
+    assert replayed.documents["doc-b"]["status"] == "done"
+
+def test_manifest_survives_a_torn_final_line(tmp_path):
+    path = tmp_path / "manifest.jsonl"
+    manifest = Manifest(str(path))
+    manifest.record("doc-a", status="running")
+    manifest.record_chunk("doc-a", 0, "first")
+    manifest.close()
+    event = json.dumps({"doc": "doc-a", "chunk": 1, "result": "second"})
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(event[:len(event) // 2])  # the process died halfway through writing chunk 1
+
+    resumed = Manifest(str(path))
+    assert resumed.documents["doc-a"]["chunks"] == {0: "first"}
+    resumed.record_chunk("doc-a", 1, "second")
+    resumed.record("doc-a", status="done")
+    resumed.close()
+
+    replayed = Manifest(str(path))
+    replayed.close()
+    assert replayed.documents["doc-a"] == {"status": "done", "chunks": {0: "first", 1: "second"}}
+
+def test_document_key_covers_content_settings_and_model(tmp_path):
+    pdf, copy, other = tmp_path / "a.pdf", tmp_path / "copy.pdf", tmp_path / "b.pdf"
+    pdf.write_bytes(b"%PDF-1.4 one")
+    copy.write_bytes(b"%PDF-1.4 one")
+    other.write_bytes(b"%PDF-1.4 two")
+    key = document_key(str(pdf), "summarize", 300, 4000, "", "map-model")
+    assert document_key(str(copy), "summarize", 300, 4000, "", "map-model") == key
+    for changed in (
+        document_key(str(other), "summarize", 300, 4000, "", "map-model"),
+        document_key(str(pdf), "research_summary", 300, 4000, "", "map-model"),
+        document_key(str(pdf), "summarize", 500, 4000, "", "map-model"),
+        document_key(str(pdf), "summarize", 300, 2000, "", "map-model"),
+        document_key(str(pdf), "summarize", 300, 4000, "clean", "map-model"),
+        document_key(str(pdf), "summarize", 300, 4000, "", "other-model"),
+    ):
+        assert changed != key
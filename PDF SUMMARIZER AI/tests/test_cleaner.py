@@ -0,0 +1,59 @@
+# PDF SUMMARIZER AI/tests/test_cleaner.py
+
+import textwrap
+from summarizer.cleaner import PageCleaner
+
+BODY = [
+    "Speech enhancement removes background noise from recordings made in busy streets and crowded offices.",
+    "We train a recurrent mask estimator on paired noisy and clean utterances drawn from public corpora.",
+    "Listening tests with forty participants show a clear preference for the enhanced signal over the baseline.",
+    "The estimator runs in real time on a laptop processor without any dedicated acceleration hardware.",
+    "Future work will extend the approach to reverberant rooms and to multiple simultaneous talkers.",
+]
+
+def wrapped(body):
+    return "\n".join(textwrap.wrap(body, 30))  # several short lines per page, like real extracted text
+
+def make_pages(bodies):
+    return [{"page": n, "text": f"Journal of Audio Research, Vol. 12\n\n{wrapped(body)}\n\nPage {n} of {len(bodies)}"}
+            for n, body in enumerate(bodies, start=1)]
+
+def test_strips_repeated_headers_and_footers_but_keeps_page_numbers():
+    cleaner = PageCleaner()
+    pages = list(cleaner.clean(make_pages(BODY)))
+    assert [page["page"] for page in pages] == [1, 2, 3, 4, 5]
+    for page, body in zip(pages, BODY):
+        assert page["text"].strip() == wrapped(body)
+    assert cleaner.lines_removed == 10 and cleaner.paragraphs_removed == 0
+    assert "Removed 10 repeated header/footer line(s)" in cleaner.report()
+
+def test_keeps_edges_when_too_few_pages_to_learn_from():
+    pages = make_pages(BODY[:2])
+    assert [page["text"] for page in PageCleaner().clean(pages)] == [page["text"] for page in pages]
+
+def test_never_blanks_a_page_made_only_of_repeated_lines():
+    pages = [{"page": n, "text": "Reviewer form\nSignature"} for n in range(1, 6)]
+    assert len(list(PageCleaner().clean(pages))) == 5
+
+def test_drops_near_duplicate_paragraphs_across_pages():
+    abstract = ("In this paper we propose a lightweight recurrent network that estimates a spectral mask "
+                "for single channel speech enhancement and evaluate it on three public benchmarks.")
+    pages = [{"page": 1, "text": f"{abstract}\n\n{BODY[0]}"}, {"page": 2, "text": f"{BODY[1]}\n\n{abstract} "},
+             {"page": 3, "text": abstract.replace("In this paper we", "Here we")}]
+    cleaner = PageCleaner(min_pages=10)
+    cleaned = list(cleaner.clean(pages))
+    assert cleaner.paragraphs_removed == 2
+    assert cleaned[0]["text"] == pages[0]["text"]
+    assert cleaned[1]["text"].strip() == BODY[1]
+    assert [page["page"] for page in cleaned] == [1, 2]  # page 3 held only the duplicate and is dropped
+    assert cleaner.tokens_saved > 0
+
+def test_keeps_rows_that_differ_only_in_numbers():
+    row = "Table 3 reports word error rate {} percent for the baseline model on the noisy evaluation set with babble noise"
+    pages = [{"page": n, "text": row.format(value)} for n, value in enumerate((12, 17, 23), start=1)]
+    cleaner = PageCleaner(min_pages=10)
+    assert len(list(cleaner.clean(pages))) == 3 and cleaner.paragraphs_removed == 0
+
+def test_short_paragraphs_are_never_deduplicated():
+    pages = [{"page": n, "text": "See Figure 2."} for n in range(1, 4)]
+    assert len(list(PageCleaner(min_pages=10).clean(pages))) == 3
@@ -0,0 +1,51 @@
+# PDF SUMMARIZER AI/tests/test_extractor.py
+
+import errno
+import os
+import shutil
+import pytest
+from benchmarks.synthetic_pdfs import make_pdf
+from summarizer import pagestore
+from summarizer.extractor import extract_all_data_by_page, extract_many
+from summarizer.pagestore import page_store
+
+PAGES = 5
+
+@pytest.fixture
+def store(tmp_path):
+    """Points the shared page store at a fresh directory for one test."""
+    directory, max_bytes = page_store.directory, page_store.max_bytes
+    page_store.configure(str(tmp_path / "pages"))
+    yield page_store
+    page_store.directory, page_store.max_bytes = directory, max_bytes
+
+@pytest.fixture
+def pdfs(tmp_path):
+    return [make_pdf(str(tmp_path / f"doc{i}.pdf"), pages=PAGES, seed=i) for i in range(2)]
+
+def test_stored_pages_match_a_fresh_extraction(store, pdfs):
+    extracted = extract_all_data_by_page(pdfs[0])
+    assert len(extracted) == PAGES and len(os.listdir(store.directory)) == 1
+    stored = extract_all_data_by_page(pdfs[0])
+    assert [(page["page"], page["text"]) for page in stored] == [(page["page"], page["text"]) for page in extracted]
+
+def test_unwritable_store_does_not_stop_extraction(store, pdfs):
+    shutil.rmtree(store.directory)  # page files can no longer be created
+    assert len(extract_all_data_by_page(pdfs[0])) == PAGES
+    assert [len(pages) for pages in extract_many(pdfs, workers=2)] == [PAGES, PAGES]
+
+def test_failed_page_write_keeps_every_page_and_leaves_no_file(store, pdfs, monkeypatch):
+    def add(self, page_number, text, paragraph_tokens):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    monkeypatch.setattr(pagestore.PageWriter, "add", add)
+    assert len(extract_all_data_by_page(pdfs[0])) == PAGES
+    assert os.listdir(store.directory) == []
+
+def test_failed_commit_keeps_every_page(store, pdfs, monkeypatch):
+    def commit(self):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    monkeypatch.setattr(pagestore.PageWriter, "commit", commit)
+    assert [len(pages) for pages in extract_many(pdfs, workers=2)] == [PAGES, PAGES]
+    assert os.listdir(store.directory) == []
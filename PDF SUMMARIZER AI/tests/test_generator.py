@@ -0,0 +1,58 @@
+# PDF SUMMARIZER AI/tests/test_generator.py
+
+from types import SimpleNamespace
+import pytest
+from summarizer.cache import make_cache_key, response_cache
+from summarizer.generator import TEMPERATURE, stream_request_with_retry
+
+MESSAGES = [{"role": "user", "content": "Summarize the paper."}]
+TEXT_FORMAT = {"type": "text"}
+
+class ScriptedClient:
+    """Stands in for the OpenAI client: each streaming call replays the next scripted list of (delta, finish_reason)."""
+
+    def __init__(self, *streams):
+        self.streams = list(streams)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(with_raw_response=SimpleNamespace(create=self.create)))
+
+    def create(self, **kwargs):
+        deltas = self.streams[self.calls]
+        self.calls += 1
+        chunks = [SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content=content), finish_reason=reason)])
+                  for content, reason in deltas]
+        return SimpleNamespace(parse=lambda: iter(chunks), headers={})
+
+class RecordingStream:
+    def __init__(self):
+        self.text = ""
+        self.resets = 0
+
+    def write(self, text: str):
+        self.text += text
+
+    def reset(self):
+        self.text = ""
+        self.resets += 1
+
+@pytest.fixture
+def cache(tmp_path):
+    response_cache.configure(str(tmp_path / "responses.sqlite3"))
+    yield response_cache
+    response_cache._conn.close()
+    response_cache._conn = None
+
+def test_stream_without_finish_reason_is_retried_and_not_cached(cache):
+    client = ScriptedClient([("The model ", None), ("improves", None)],
+                            [("The model ", None), ("improves SNR.", None), (None, "stop")])
+    stream = RecordingStream()
+    text = stream_request_with_retry(client, "model", MESSAGES, 3, 0, False, stream)
+    assert text == stream.text == "The model improves SNR."
+    assert client.calls == 2 and stream.resets == 2
+    assert cache.get(make_cache_key("model", MESSAGES, TEMPERATURE, TEXT_FORMAT)) == "The model improves SNR."
+
+def test_streams_that_never_finish_fail_without_caching(cache):
+    client = ScriptedClient(*[[("partial", None)]] * 2)
+    text = stream_request_with_retry(client, "model", MESSAGES, 2, 0, False, RecordingStream())
+    assert text.startswith("Error:") and client.calls == 2
+    assert cache.get(make_cache_key("model", MESSAGES, TEMPERATURE, TEXT_FORMAT)) is None
@@ -0,0 +1,89 @@
+# PDF SUMMARIZER AI/tests/test_pagestore.py
+
+import os
+import pytest
+from summarizer.pagestore import PageStore
+
+PAGES = [
+    (1, "Plain ASCII text.\n\nSecond paragraph.", [4, 3]),
+    (3, "Ünïcödé — naïve café, 3 dB ± 0.5", [12]),
+    (4, "", []),
+    (7, "Last page", [2]),
+]
+
+@pytest.fixture
+def store(tmp_path):
+    store = PageStore()
+    store.configure(str(tmp_path / "pages"), max_bytes=0)
+    return store
+
+def write_pages(store, path, pages=PAGES):
+    writer = store.writer(path)
+    try:
+        for page_number, text, paragraph_tokens in pages:
+            writer.add(page_number, text, paragraph_tokens)
+        writer.commit()
+    finally:
+        writer.close()
+
+def test_round_trip(store):
+    path = os.path.join(store.directory, "doc-v1.pages")
+    write_pages(store, path)
+    with store.open(path) as stored:
+        assert len(stored) == len(PAGES)
+        assert [(page["page"], page["text"], page["paragraph_tokens"]) for page in stored] == PAGES
+    assert os.listdir(store.directory) == ["doc-v1.pages"]  # the temporary file was moved into place
+
+def test_empty_document_round_trips(store):
+    path = os.path.join(store.directory, "empty-v1.pages")
+    write_pages(store, path, [])
+    with store.open(path) as stored:
+        assert list(stored) == []
+
+def test_missing_file_is_a_miss(store):
+    assert store.open(os.path.join(store.directory, "absent.pages")) is None
+
+@pytest.mark.parametrize("damage", [
+    lambda data: b"NOTPAGES" + data[8:],             # wrong magic
+    lambda data: data[:8] + b"\x63" + data[9:],      # unknown format version
+    lambda data: data[:len(data) - 8],               # truncated arrays
+    lambda data: data[:20],                          # truncated header
+    lambda data: b"",                                # empty file
+])
+def test_corrupt_files_are_rejected(store, damage):
+    path = os.path.join(store.directory, "doc-v1.pages")
+    write_pages(store, path)
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path, "wb") as f:
+        f.write(damage(data))
+    assert store.open(path) is None
+
+def test_uncommitted_writer_leaves_nothing_behind(store):
+    path = os.path.join(store.directory, "doc-v1.pages")
+    writer = store.writer(path)
+    writer.add(1, "partial", [1])
+    writer.close()
+    assert os.listdir(store.directory) == []
+
+def test_path_for_keys_on_content_and_extractor_version(store, tmp_path):
+    first, second, copy = tmp_path / "a.pdf", tmp_path / "b.pdf", tmp_path / "c.pdf"
+    first.write_bytes(b"%PDF-1.4 one")
+    second.write_bytes(b"%PDF-1.4 two")
+    copy.write_bytes(b"%PDF-1.4 one")
+    assert store.path_for(str(first), 1) == store.path_for(str(copy), 1)
+    assert store.path_for(str(first), 1) != store.path_for(str(second), 1)
+    assert store.path_for(str(first), 1) != store.path_for(str(first), 2)
+    assert store.path_for(str(tmp_path / "missing.pdf"), 1) is None
+    assert PageStore().path_for(str(first), 1) is None  # disabled store
+
+def test_least_recently_used_files_are_evicted(store):
+    paths = [os.path.join(store.directory, f"doc{i}-v1.pages") for i in range(3)]
+    for age, path in enumerate(paths):
+        write_pages(store, path)
+        os.utime(path, (1_000_000 + age, 1_000_000 + age))
+    size = os.path.getsize(paths[0])
+    store.open(paths[0]).close()  # reading marks doc0 as the most recently used
+    store.max_bytes = 2 * size
+    store._evict()
+    assert sorted(os.listdir(store.directory)) == ["doc0-v1.pages", "doc2-v1.pages"]
@@ -0,0 +1,103 @@
+# PDF SUMMARIZER AI/tests/test_ratelimit.py
+
+import pytest
+from summarizer import ratelimit
+from summarizer.ratelimit import RateLimiter, TokenBucket, parse_duration
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Records the waits acquire() asks for instead of sleeping through them."""
+    waits = []
+    monkeypatch.setattr(ratelimit.time, "sleep", waits.append)
+    return waits
+
+@pytest.mark.parametrize("value, seconds", [
+    ("7.66s", 7.66), ("2m59.56s", 179.56), ("120ms", 0.12), ("1h", 3600.0), ("30", 30.0), (12, 12.0), ("-3", 0.0),
+])
+def test_parse_duration(value, seconds):
+    assert parse_duration(value) == pytest.approx(seconds)
+
+@pytest.mark.parametrize("value", [None, "", "soon"])
+def test_parse_duration_rejects_unknown_values(value):
+    assert parse_duration(value) is None
+
+def test_bucket_spends_its_capacity_then_waits_for_the_refill():
+    bucket = TokenBucket(60, period=60.0)  # one unit per second
+    assert bucket.reserve(60, now=bucket.updated) == 0.0
+    assert bucket.reserve(1, now=bucket.updated) == pytest.approx(1.0)
+    assert bucket.reserve(2, now=bucket.updated) == pytest.approx(3.0)  # reservations queue up behind each other
+    assert bucket.reserve(1, now=bucket.updated + 10) == pytest.approx(0.0)
+
+def test_bucket_never_refills_beyond_capacity():
+    bucket = TokenBucket(10, period=60.0)
+    bucket.reserve(5, now=bucket.updated)
+    bucket.adjust(100, now=bucket.updated + 600)
+    assert bucket.available == 10
+
+def test_oversized_requests_wait_for_at_most_one_full_bucket():
+    bucket = TokenBucket(100, period=60.0)
+    bucket.reserve(100, now=bucket.updated)
+    assert bucket.reserve(10_000, now=bucket.updated) == pytest.approx(60.0)
+
+def test_sync_only_lowers_the_budget():
+    bucket = TokenBucket(100, period=60.0)
+    bucket.sync(40, now=bucket.updated)
+    assert bucket.available == 40
+    bucket.sync(90, now=bucket.updated)
+    assert bucket.available == 40
+
+def test_acquire_paces_requests(sleeps):
+    limiter = RateLimiter(requests_per_minute=2)
+    limiter.acquire()
+    limiter.acquire()
+    assert sleeps == []
+    limiter.acquire()
+    assert sleeps == [pytest.approx(30.0, abs=0.5)]
+
+def test_acquire_budgets_tokens_and_reconciles_actual_usage(sleeps):
+    limiter = RateLimiter(tokens_per_minute=1000)
+    limiter.acquire(900)
+    limiter.record_usage(estimated_tokens=900, actual_tokens=400)  # the estimate was pessimistic: 500 tokens come back
+    limiter.acquire(500)
+    assert sleeps == []
+    limiter.acquire(300)
+    assert sleeps == [pytest.approx(12.0, abs=0.5)]
+
+def test_disabled_limiter_never_waits(sleeps):
+    limiter = RateLimiter()
+    for _ in range(100):
+        limiter.acquire(10_000)
+    assert sleeps == []
+
+def test_exhausted_headers_pause_until_the_reset(sleeps):
+    limiter = RateLimiter(requests_per_minute=100)
+    limiter.update_from_headers({"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "2.5s"})
+    limiter.acquire()
+    assert sleeps == [pytest.approx(2.5, abs=0.5)]
+
+def test_retry_after_pauses_every_caller(sleeps):
+    limiter = RateLimiter()
+    assert limiter.backoff_delay(0, base_delay=0.01, headers={"retry-after": "4"}) >= 4
+    limiter.acquire()
+    assert sleeps == [pytest.approx(4.0, abs=0.5)]
+
+def test_backoff_is_capped():
+    limiter = RateLimiter()
+    assert all(0 <= limiter.backoff_delay(20, base_delay=1.0, max_delay=5.0) <= 5.0 for _ in range(50))
+
+def test_models_get_separate_budgets(sleeps):
+    limiter = RateLimiter(requests_per_minute=1)
+    assert limiter.for_model("map-model") is limiter.for_model("map-model")
+    limiter.for_model("map-model").acquire()
+    limiter.for_model("reduce-model").acquire()
+    limiter.for_model("reduce-model").pause(30)
+    assert sleeps == []
+    limiter.for_model("map-model").acquire()
+    assert sleeps == [pytest.approx(60.0, abs=0.5)]
+
+def test_configure_resets_the_per_model_limiters():
+    limiter = RateLimiter(requests_per_minute=1)
+    model_limiter = limiter.for_model("map-model")
+    limiter.configure(requests_per_minute=0, tokens_per_minute=500)
+    fresh = limiter.for_model("map-model")
+    assert fresh is not model_limiter and fresh.requests is None and fresh.tokens.capacity == 500
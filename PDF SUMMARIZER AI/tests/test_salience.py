@@ -0,0 +1,58 @@
+# PDF SUMMARIZER AI/tests/test_salience.py
+
+import pytest
+from summarizer.salience import SalienceFilter
+
+ON_TOPIC = [
+    "The speech enhancement network estimates a spectral mask for noisy speech recordings.",
+    "Noisy speech is enhanced by applying the estimated spectral mask to the noisy spectrogram.",
+    "Training pairs noisy speech with clean speech so the network learns the spectral mask.",
+    "The enhanced speech keeps the spectral detail of the clean speech while removing noise.",
+]
+OFF_TOPIC = [
+    "Acknowledgements go to colleagues who lent their kitchen chairs for the listening booth.",
+    "Funding was provided by a regional foundation supporting community gardening projects.",
+]
+
+def test_scores_favour_passages_close_to_the_document_centroid():
+    scores = SalienceFilter().score(ON_TOPIC + OFF_TOPIC)
+    assert min(scores[:4]) > max(scores[4:])
+
+def test_number_boost_lifts_quantitative_passages():
+    plain = "The spectral mask improves noisy speech quality for listeners."
+    numeric = "The spectral mask improves noisy speech quality by 3 dB for listeners."
+    scores = SalienceFilter(number_boost=0.5).score([plain, numeric, ON_TOPIC[0]])
+    assert scores[1] > scores[0]
+    assert SalienceFilter(number_boost=0.5).score([numeric])[0] == pytest.approx(1.5 * SalienceFilter(number_boost=0.0).score([numeric])[0])
+
+def test_filter_keeps_salient_passages_within_budget_in_document_order():
+    pages = [
+        {"page": 1, "text": f"{ON_TOPIC[0]}\n\n{OFF_TOPIC[0]}"},
+        {"page": 2, "text": f"{OFF_TOPIC[1]}"},
+        {"page": 3, "text": f"{ON_TOPIC[1]}\n\n{ON_TOPIC[2]}\n\n{ON_TOPIC[3]}"},
+    ]
+    salience = SalienceFilter(keep_ratio=0.7)
+    kept = salience.filter(pages)
+    assert [page["page"] for page in kept] == [1, 3]  # page 2 held only off-topic text and is dropped
+    assert kept[0]["text"] == ON_TOPIC[0]
+    assert OFF_TOPIC[0] not in kept[0]["text"]
+    text = "\n\n".join(page["text"] for page in kept)
+    positions = [text.find(passage) for passage in ON_TOPIC if passage in text]
+    assert len(positions) >= 2 and positions == sorted(positions)
+    assert salience.tokens_kept <= 0.7 * salience.tokens_before
+    assert salience.paragraphs_before == 6 and 0 < salience.paragraphs_kept < 6
+
+def test_filter_keeps_at_least_one_passage():
+    kept = SalienceFilter(token_budget=1).filter([{"page": 4, "text": "\n\n".join(ON_TOPIC)}])
+    assert len(kept) == 1 and kept[0]["page"] == 4 and kept[0]["text"] in ON_TOPIC
+
+def test_short_documents_pass_through_unchanged():
+    pages = [{"page": 1, "text": f"{ON_TOPIC[0]}\n\n{OFF_TOPIC[0]}"}]
+    salience = SalienceFilter(keep_ratio=0.1, min_tokens=100_000)
+    assert salience.filter(pages) == pages
+    assert salience.paragraphs_kept == salience.paragraphs_before == 2
+
+def test_long_paragraphs_are_split_into_sentence_runs():
+    long_paragraph = " ".join(ON_TOPIC * 3)
+    units = SalienceFilter(max_unit_words=30)._units(long_paragraph)
+    assert len(units) > 1 and " ".join(units) == long_paragraph
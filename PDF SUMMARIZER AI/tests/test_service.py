@@ -0,0 +1,102 @@
+# PDF SUMMARIZER AI/tests/test_service.py
+
+import asyncio
+import os
+import tempfile
+import time
+import aiohttp
+from aiohttp.test_utils import TestClient, TestServer
+from openai import OpenAI
+import config
+from benchmarks.fake_openai_server import FakeOpenAIServer, FakeSettings
+from benchmarks.synthetic_pdfs import make_pdf
+from service import create_app
+
+PDF_HEADERS = {"Content-Type": "application/pdf"}
+
+def _submit(http: TestClient, pdf: bytes, query: str = "task=summarize&word_count=50"):
+    return http.post(f"/jobs?{query}", data=pdf, headers=PDF_HEADERS)
+
+async def _wait_for(http: TestClient, job_id: str, timeout: float = 60.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = await (await http.get(f"/jobs/{job_id}")).json()
+        if status["status"] in ("done", "failed"):
+            return status
+        await asyncio.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish within {timeout}s")
+
+def test_job_lifecycle_against_stub(tmp_path, prompts_data):
+    pdf = open(make_pdf(str(tmp_path / "doc.pdf"), pages=3), "rb").read()
+
+    async def scenario(base_url: str):
+        client = OpenAI(api_key="test-key", base_url=base_url, max_retries=0)
+        async with TestClient(TestServer(create_app(client, prompts_data))) as http:
+            response = await _submit(http, pdf)
+            assert response.status == 202
+            job = await response.json()
+            assert job["status"] == "queued"
+            assert response.headers["Location"] == f"/jobs/{job['job_id']}"
+
+            status = await _wait_for(http, job["job_id"])
+            assert status["status"] == "done", status["error"]
+
+            result = await (await http.get(f"/jobs/{job['job_id']}/result")).json()
+            assert result["raw"] and result["result"]
+            assert (await http.get("/jobs/unknown")).status == 404
+
+    with FakeOpenAIServer(FakeSettings(latency=0.01)) as server:
+        asyncio.run(scenario(server.base_url))
+        assert server.settings.stats["requests"] >= 1
+
+def test_full_queue_is_rejected_with_503(tmp_path, prompts_data, monkeypatch):
+    # No workers, so the single queue slot stays taken.
+    monkeypatch.setattr(config, "SERVICE_QUEUE_SIZE", 1)
+    monkeypatch.setattr(config, "SERVICE_WORKERS", 0)
+    pdf = open(make_pdf(str(tmp_path / "doc.pdf"), pages=1), "rb").read()
+
+    async def scenario():
+        client = OpenAI(api_key="test-key", base_url="http://127.0.0.1:9/v1", max_retries=0)
+        async with TestClient(TestServer(create_app(client, prompts_data))) as http:
+            assert (await _submit(http, pdf)).status == 202
+            response = await _submit(http, pdf)
+            assert response.status == 503
+            assert response.headers["Retry-After"] == "5"
+
+    asyncio.run(scenario())
+
+def test_rejects_invalid_requests(tmp_path, prompts_data):
+    pdf = open(make_pdf(str(tmp_path / "doc.pdf"), pages=1), "rb").read()
+
+    async def scenario():
+        client = OpenAI(api_key="test-key", base_url="http://127.0.0.1:9/v1", max_retries=0)
+        async with TestClient(TestServer(create_app(client, prompts_data))) as http:
+            for query in ("task=summarize&word_count=0", "task=summarize&word_count=-5",
+                          "task=summarize&word_count=many", "task=translate"):
+                assert (await _submit(http, pdf, query)).status == 400, query
+            assert (await _submit(http, b"", "task=summarize")).status == 400
+
+    asyncio.run(scenario())
+
+def test_oversized_uploads_are_rejected_with_413(monkeypatch, prompts_data):
+    monkeypatch.setattr(config, "SERVICE_MAX_UPLOAD_MB", 1)
+    monkeypatch.setattr(config, "SERVICE_WORKERS", 0)
+    body = b"%PDF-1.4\n" + b"0" * (3 * 1024 * 1024)
+    workdirs, real_mkdtemp = [], tempfile.mkdtemp
+
+    def mkdtemp(**kwargs):
+        workdirs.append(real_mkdtemp(**kwargs))
+        return workdirs[-1]
+
+    monkeypatch.setattr(tempfile, "mkdtemp", mkdtemp)
+
+    async def scenario():
+        client = OpenAI(api_key="test-key", base_url="http://127.0.0.1:9/v1", max_retries=0)
+        async with TestClient(TestServer(create_app(client, prompts_data))) as http:
+            assert (await _submit(http, body)).status == 413
+            form = aiohttp.FormData()
+            form.add_field("file", body, filename="big.pdf", content_type="application/pdf")
+            assert (await http.post("/jobs?task=summarize", data=form)).status == 413
+
+    asyncio.run(scenario())
+    assert len(workdirs) == 2 and not any(os.path.exists(workdir) for workdir in workdirs)
@@ -0,0 +1,67 @@
+# PDF SUMMARIZER AI/tests/test_structured.py
+
+import json
+from summarizer.structured import StructuredMerger, merge_source_pages, parse_structured, repair_json
+
+STRUCTURE = {"title": "", "key_findings": [{"finding": "", "evidence": "", "source_page": "", "confidence": ""}]}
+
+def test_repair_passes_valid_json_through():
+    assert repair_json('{"title": "t", "key_findings": []}') == {"title": "t", "key_findings": []}
+
+def test_repair_strips_fences_and_trailing_commas():
+    assert repair_json('```json\n{"a": [1, 2,], "b": "x",}\n```') == {"a": [1, 2], "b": "x"}
+
+def test_repair_strips_surrounding_prose():
+    assert repair_json('Here is the JSON you asked for: {"a": 1} Hope this helps!') == {"a": 1}
+
+def test_repair_closes_truncated_output_dropping_the_partial_item():
+    truncated = '{"title": "t", "key_findings": [{"finding": "kept", "source_page": "3"}, {"finding": "cut off mid'
+    assert repair_json(truncated) == {"title": "t", "key_findings": [{"finding": "kept", "source_page": "3"}]}
+
+def test_repair_backs_off_a_dangling_key():
+    assert repair_json('{"title": "t", "key_findings": [{"finding": "x", "evidence": ') == {"title": "t", "key_findings": [{"finding": "x"}]}
+
+def test_repair_gives_up_on_non_json():
+    assert repair_json("I cannot help with that.") is None
+    assert repair_json("") is None
+    assert repair_json("[1, 2, 3]") is None  # only objects are valid replies
+
+def test_parse_structured_fills_missing_fields_and_wraps_lone_objects():
+    data = parse_structured('{"key_findings": {"finding": "x"}, "title": 7}', STRUCTURE)
+    assert data == {"title": "7", "key_findings": [{"finding": "x"}]}
+
+def test_parse_structured_rejects_placeholders_and_empty_replies():
+    assert parse_structured('{"error": "API operation failed after multiple retries."}', STRUCTURE) is None
+    assert parse_structured('{"title": "", "key_findings": []}', STRUCTURE) is None
+    assert parse_structured('{"title": "t", "key_findings": "none"}', STRUCTURE) is None
+
+def test_merge_source_pages_compacts_ranges():
+    assert merge_source_pages("3", "4-6", "9", None) == "3-6, 9"
+    assert merge_source_pages("", "Multiple Docs") == "Multiple Docs"
+
+def test_merger_folds_repeated_findings_from_overlapping_chunks():
+    merger = StructuredMerger()
+    merger.add({"title": "First", "key_findings": [{"finding": "The model improves SNR by 3 dB", "source_page": "3", "confidence": "low"}]})
+    merger.add({"title": "Second", "key_findings": [
+        {"finding": "The model improves SNR by 3 dB.", "evidence": "Table 2 shows it", "source_page": "4-5", "confidence": "high"},
+        {"finding": "Latency drops below 10 ms", "source_page": "7"},
+    ]})
+    assert merger.merged == 2 and merger.duplicates == 1
+    assert merger.result["title"] == "First"
+    first, second = merger.result["key_findings"]
+    assert first == {"finding": "The model improves SNR by 3 dB.", "evidence": "Table 2 shows it", "source_page": "3-5", "confidence": "high"}
+    assert second["finding"] == "Latency drops below 10 ms"
+
+def test_merger_keeps_results_that_differ_only_in_numbers():
+    merger = StructuredMerger()
+    merger.add({"key_findings": [{"finding": "The model improves SNR by 3 dB"}]})
+    merger.add({"key_findings": [{"finding": "The model improves SNR by 5 dB"}]})
+    assert len(merger.result["key_findings"]) == 2 and merger.duplicates == 0
+
+def test_merger_compares_items_within_the_same_document_only():
+    insight = "Uses a spectral mask estimated by a small network"
+    merger = StructuredMerger()
+    merger.add({"unique_insights": [{"document_name": "a.pdf", "insight": insight}]})
+    merger.add({"unique_insights": [{"document_name": "b.pdf", "insight": insight}]})
+    assert len(merger.result["unique_insights"]) == 2
+    json.dumps(merger.result)  # stays serializable